@@ -0,0 +1,35 @@
+import argparse
+import sys
+
+from database_manager import DatabaseManager
+
+def main():
+    parser = argparse.ArgumentParser(description="Grant or revoke TypeMaster admin rights")
+    parser.add_argument("action", choices=("grant", "revoke", "list"), help="what to do")
+    parser.add_argument("usernames", nargs="*", help="users to grant or revoke")
+    parser.add_argument("--db", default="typing_data.db", help="database file (default: typing_data.db)")
+    args = parser.parse_args()
+
+    db_manager = DatabaseManager(args.db)
+    db_manager.setup_database()
+    try:
+        if args.action == "list":
+            for (username,) in db_manager.execute(
+                    "SELECT username FROM users WHERE is_admin ORDER BY username").fetchall():
+                print(username)
+            return
+
+        failed = False
+        for username in args.usernames:
+            if db_manager.set_admin(username, args.action == "grant"):
+                print(f"{'Granted' if args.action == 'grant' else 'Revoked'} admin rights for {username}")
+            else:
+                print(f"No such user: {username}", file=sys.stderr)
+                failed = True
+        if failed:
+            sys.exit(1)
+    finally:
+        db_manager.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+"""Benchmark database queries and chart building on large synthetic databases.
+
+Synthetic databases with the requested numbers of test_results rows are
+built once and cached (building 10M rows takes a while). Benchmarks run
+on a copy, so results saved by the save benchmark never reach the cache
+and every run measures the same data. Every benchmark is repeated and
+reported as JSON; with --baseline the run fails when a median is slower
+than the baseline's by more than --threshold.
+
+    python benchmarks/database_suite.py --sizes 10k,1m --output baseline.json
+    python benchmarks/database_suite.py --sizes 10k,1m --baseline baseline.json --threshold 0.25
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Charts are drawn offscreen
+import matplotlib
+matplotlib.use("Agg")
+
+from database_manager import DatabaseManager
+from migrations import LEADERBOARD_UPSERT, USER_STATS_UPSERT, SCHEMA_VERSION
+
+SIZES = {"10k": 10000, "100k": 100000, "1m": 1000000, "10m": 10000000}
+
+# Test settings drawn for synthetic results: (mode, value)
+MODES = [("time", 15), ("time", 30), ("time", 60), ("words", 10), ("words", 25),
+         ("words", 50), ("paragraph", None), ("endless", None)]
+DIFFICULTIES = ("beginner", "intermediate", "advanced")
+
+# Rows inserted per transaction while building
+BUILD_BATCH = 50000
+
+def user_count(rows):
+    """Thousands of users, with more for bigger databases"""
+    return min(max(rows // 1000, 1000), 10000)
+
+def synthetic_rows(rng, first, count, rows, users, start, span):
+    """Generate count test_results rows, in time order across the whole database"""
+    for i in range(first, first + count):
+        user = rng.randrange(users)
+        mode, value = MODES[(user + rng.randrange(3)) % len(MODES)]
+        # Each user has a skill level and slowly improves
+        wpm = max(rng.gauss(30 + user % 90 + 15 * i / rows, 8), 5)
+        accuracy = min(rng.gauss(94, 4), 100)
+        total = int(wpm * 5 * (value or 30) / 60)
+        timestamp = start + timedelta(seconds=span * i / rows + rng.random())
+        yield (f"user{user}", mode, value, rng.choice(DIFFICULTIES), wpm, accuracy,
+               rng.randrange(20), int(total * accuracy / 100), total, float(value or 30),
+               timestamp.strftime("%Y-%m-%d %H:%M:%S"), uuid.UUID(int=rng.getrandbits(128)).hex)
+
+def build_database(path, rows, seed=1):
+    """Create a database with rows synthetic results and the derived tables"""
+    users = user_count(rows)
+    db_manager = DatabaseManager(path, synchronous="OFF")
+    db_manager.setup_database()
+
+    with db_manager.transaction() as cursor:
+        cursor.executemany(
+            "INSERT INTO users (username, password, email) VALUES (?, ?, ?)",
+            ((f"user{n}", "benchmark", f"user{n}@example.com") for n in range(users))
+        )
+
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    span = 2 * 365 * 24 * 3600
+    for first in range(0, rows, BUILD_BATCH):
+        count = min(BUILD_BATCH, rows - first)
+        with db_manager.transaction() as cursor:
+            cursor.executemany('''
+            INSERT INTO test_results 
+            (username, test_mode, test_value, difficulty, wpm, accuracy, errors, correct_chars, total_chars, test_duration, timestamp, result_uid) 
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', synthetic_rows(rng, first, count, rows, users, start, span))
+            cursor.execute(LEADERBOARD_UPSERT, (first, first + count))
+            cursor.execute(USER_STATS_UPSERT, (first, first + count))
+
+    with db_manager.transaction() as cursor:
+        cursor.execute('''
+        UPDATE users SET 
+            tests_completed = (SELECT SUM(tests) FROM user_stats s WHERE s.username = users.username), 
+            avg_wpm = (SELECT SUM(sum_wpm) / SUM(tests) FROM user_stats s WHERE s.username = users.username), 
+            avg_accuracy = (SELECT SUM(sum_accuracy) / SUM(tests) FROM user_stats s WHERE s.username = users.username)
+        ''')
+        cursor.execute("CREATE TABLE benchmark_info (rows INTEGER, seed INTEGER)")
+        cursor.execute("INSERT INTO benchmark_info VALUES (?, ?)", (rows, seed))
+    db_manager.execute("ANALYZE")
+    db_manager.close()
+
+def cached_database(cache_dir, rows, seed=1):
+    """Path of a synthetic database, building it if it is missing or stale"""
+    path = os.path.join(cache_dir, f"synthetic_{rows}_seed{seed}.db")
+    if os.path.exists(path):
+        conn = sqlite3.connect(path)
+        try:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            info = conn.execute("SELECT rows, seed FROM benchmark_info").fetchone()
+        except sqlite3.Error:
+            version, info = None, None
+        finally:
+            conn.close()
+        if version == SCHEMA_VERSION and info == (rows, seed):
+            return path
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+    print(f"Building {path} ...", file=sys.stderr)
+    start = time.perf_counter()
+    build_database(path, rows, seed)
+    print(f"Built in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    return path
+
+def working_copy(path, work_dir):
+    """Copy a cached database into work_dir, so benchmarks that write leave it untouched"""
+    copy_path = os.path.join(work_dir, os.path.basename(path))
+    shutil.copyfile(path, copy_path)
+    return copy_path
+
+def measure(func, repeat):
+    """Call func repeat times and summarize the wall-clock times"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return {"median_s": statistics.median(times), "min_s": min(times), "runs": repeat}
+
+def run_benchmarks(path, repeat, work_dir):
+    """Time the database and chart operations on one database"""
+    from chart_data import load_progress
+    from stats_visualizer import StatsVisualizer
+
+    db_manager = DatabaseManager(path)
+    db_manager.setup_database()
+    rng = random.Random(7)
+    users = [row[0] for row in db_manager.execute("SELECT username FROM users").fetchall()]
+    # The user with the longest history, for the worst-case per-user queries
+    heavy_user = db_manager.execute(
+        "SELECT username FROM user_stats GROUP BY username ORDER BY SUM(tests) DESC LIMIT 1"
+    ).fetchone()[0]
+
+    def save():
+        for _ in range(20):
+            db_manager.save_test_results(rng.choice(users), "time", "intermediate", rng.uniform(20, 120),
+                                         rng.uniform(85, 100), 3, 140, 145, 30.0, 30)
+
+    def leaderboard():
+        db_manager.get_leaderboard(10)
+        db_manager.get_leaderboard(10, mode="time", value=30, window="month")
+
+    def words_cold():
+        db_manager.word_corpus.word_lists = {}
+        for difficulty in DIFFICULTIES:
+            db_manager.get_words(difficulty)
+
+    def paragraphs():
+        for _ in range(20):
+            db_manager.get_paragraph(rng.choice(DIFFICULTIES), rng.choice(users))
+
+    visualizer = StatsVisualizer(None, db_manager)
+    progress_data = load_progress(db_manager, heavy_user)
+    wpm_over_time = [rng.uniform(40, 80) for _ in range(60)]
+
+    benchmarks = {
+        # 20 saves per run
+        "save_test_results": save,
+        "get_user_history": lambda: db_manager.get_user_history(rng.choice(users)),
+        "get_user_history_heavy": lambda: db_manager.get_user_history(heavy_user),
+        "get_history_page": lambda: db_manager.get_history_page(heavy_user, 100),
+        "get_user_progress": lambda: db_manager.get_user_progress(heavy_user),
+        "load_progress": lambda: load_progress(db_manager, heavy_user),
+        "get_leaderboard": leaderboard,
+        "get_leaderboard_page": lambda: db_manager.get_leaderboard_page(100),
+        "export_results": lambda: db_manager.export_results(heavy_user, os.path.join(work_dir, "export.csv")),
+        "get_words_cold": words_cold,
+        "get_words": lambda: db_manager.get_words("intermediate"),
+        # 20 picks per run
+        "get_paragraph": paragraphs,
+        "chart_progress": lambda: visualizer.create_progress_graph(None, progress_data, "wpm", "WPM Progress"),
+        "chart_progress_weekly": lambda: visualizer.create_progress_graph(None, progress_data, "accuracy",
+                                                                          "Accuracy Progress", "week"),
+        "chart_wpm": lambda: visualizer.create_wpm_graph(wpm_over_time, 60.0),
+    }
+
+    results = {}
+    for name, func in benchmarks.items():
+        # One unmeasured call warms caches the way a running app would
+        func()
+        results[name] = measure(func, repeat)
+    db_manager.close()
+    return results
+
+def compare(results, baseline, threshold, min_delta=0.0):
+    """List the benchmarks whose median regressed past the threshold.
+
+    Slowdowns under min_delta seconds are ignored, since the fastest
+    benchmarks vary by more than the threshold from run to run.
+    """
+    regressions = []
+    for size, benchmarks in results.items():
+        for name, result in benchmarks.items():
+            previous = baseline.get("results", {}).get(size, {}).get(name)
+            if not previous:
+                continue
+            slower = result["median_s"] - previous["median_s"]
+            if slower > previous["median_s"] * threshold and slower > min_delta:
+                regressions.append(f"{size} {name}: {previous['median_s'] * 1000:.2f} ms -> "
+                                   f"{result['median_s'] * 1000:.2f} ms")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark TypeMaster on synthetic databases")
+    parser.add_argument("--sizes", default="10k,1m", help=f"comma-separated sizes from {', '.join(SIZES)}")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per benchmark")
+    parser.add_argument("--cache-dir", default=os.path.join(tempfile.gettempdir(), "typemaster-bench"),
+                        help="where synthetic databases are kept between runs")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed slowdown against the baseline (0.25 = 25%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=0.5,
+                        help="ignore slowdowns smaller than this many milliseconds")
+    args = parser.parse_args()
+
+    sizes = [size.strip().lower() for size in args.sizes.split(",")]
+    unknown = [size for size in sizes if size not in SIZES]
+    if unknown:
+        parser.error(f"unknown sizes: {', '.join(unknown)}")
+    os.makedirs(args.cache_dir, exist_ok=True)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "repeat": args.repeat
+        },
+        "results": {}
+    }
+    with tempfile.TemporaryDirectory() as work_dir:
+        for size in sizes:
+            path = working_copy(cached_database(args.cache_dir, SIZES[size]), work_dir)
+            report["results"][size] = run_benchmarks(path, args.repeat, work_dir)
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output + "\n")
+    print(output)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(report["results"], json.load(file), args.threshold,
+                                  args.min_delta_ms / 1000.0)
+        if regressions:
+            print(f"Regressions over {args.threshold:.0%}:", file=sys.stderr)
+            for regression in regressions:
+                print(f"  {regression}", file=sys.stderr)
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Measure TypeMaster startup time to the first painted window.
+
+Each run starts a fresh interpreter in a scratch directory holding a copy of
+the database, so nothing cached by an earlier run hides import cost. A
+display is required (use xvfb-run on headless machines).
+
+    python benchmarks/startup_time.py --runs 5
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that should not be loaded before the first paint
+HEAVY_MODULES = ("matplotlib", "numpy", "pygame")
+
+def child(launched):
+    """Start the app, wait for the first paint and print timings as JSON"""
+    start = time.perf_counter()
+    sys.path.insert(0, ROOT)
+    import main
+    imported = time.perf_counter()
+
+    app = main.TypeMaster()
+    # Process the pending geometry and redraw events of the welcome screen
+    app.update_idletasks()
+    app.update()
+    painted = time.perf_counter()
+
+    report = {
+        # Includes interpreter startup, measured from when the parent launched us
+        "first_paint_s": time.time() - launched,
+        "import_s": imported - start,
+        "window_s": painted - imported,
+        "heavy_modules_loaded": [name for name in HEAVY_MODULES if name in sys.modules]
+    }
+    app.on_close()
+    print(json.dumps(report))
+
+def run_once(work_dir):
+    """Start one child process and return its report"""
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", str(time.time())],
+        cwd=work_dir, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure time to first paint of TypeMaster")
+    parser.add_argument("--runs", type=int, default=5, help="number of cold starts to time")
+    parser.add_argument("--child", type=float, metavar="LAUNCHED", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        child(args.child)
+        return
+
+    work_dir = tempfile.mkdtemp(prefix="typemaster-startup-")
+    try:
+        database = os.path.join(ROOT, "typing_data.db")
+        if os.path.exists(database):
+            shutil.copy(database, work_dir)
+        os.symlink(os.path.join(ROOT, "sounds"), os.path.join(work_dir, "sounds"))
+
+        reports = [run_once(work_dir) for _ in range(args.runs)]
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    for key in ("first_paint_s", "import_s", "window_s"):
+        values = [report[key] for report in reports]
+        print(f"{key:15} median {statistics.median(values) * 1000:8.1f} ms"
+              f"   min {min(values) * 1000:8.1f} ms   max {max(values) * 1000:8.1f} ms")
+    loaded = sorted({name for report in reports for name in report["heavy_modules_loaded"]})
+    print(f"heavy modules loaded before first paint: {', '.join(loaded) or 'none'}")
+
+if __name__ == "__main__":
+    main()
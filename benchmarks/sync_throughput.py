@@ -0,0 +1,107 @@
+"""Measure end-to-end result sync throughput against a localhost sync server.
+
+Starts sync_server.py in a child process with an empty database, fills
+several kiosk databases with queued results and syncs them all at once,
+then resends one batch to check it is not stored twice.
+
+    python benchmarks/sync_throughput.py --kiosks 30 --results 2000
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from database_manager import DatabaseManager
+from sync_client import SyncClient
+
+def start_server(db_file):
+    """Start the sync server on a free port and return (process, url)"""
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, "sync_server.py"), "--db", db_file,
+         "--host", "127.0.0.1", "--port", "0", "--quiet"],
+        stdout=subprocess.PIPE, text=True
+    )
+    # "Listening on http://127.0.0.1:PORT"
+    url = process.stdout.readline().split()[-1]
+    return process, url
+
+def fill_kiosk(db_file, kiosk, count):
+    """Create a kiosk database with count queued results"""
+    db_manager = DatabaseManager(db_file)
+    db_manager.setup_database()
+    rows = [
+        (f"kiosk{kiosk}-user{random.randrange(20)}", "time", 30, "intermediate",
+         random.uniform(20, 120), random.uniform(85, 100), random.randrange(10),
+         random.randrange(100, 300), random.randrange(100, 300), 30.0,
+         f"2026-{random.randrange(1, 13):02d}-{random.randrange(1, 29):02d} 12:00:00", uuid.uuid4().hex)
+        for _ in range(count)
+    ]
+    with db_manager.transaction() as cursor:
+        cursor.executemany('''
+        INSERT INTO test_results 
+        (username, test_mode, test_value, difficulty, wpm, accuracy, errors, correct_chars, total_chars, test_duration, timestamp, result_uid) 
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', rows)
+    return db_manager
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure result sync throughput")
+    parser.add_argument("--kiosks", type=int, default=30, help="number of syncing installs")
+    parser.add_argument("--results", type=int, default=2000, help="queued results per install")
+    parser.add_argument("--batch-size", type=int, default=500, help="results per request")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        server, url = start_server(os.path.join(work_dir, "server.db"))
+        try:
+            kiosks = [fill_kiosk(os.path.join(work_dir, f"kiosk{i}.db"), i, args.results)
+                      for i in range(args.kiosks)]
+            clients = [SyncClient(db_manager, url, batch_size=args.batch_size) for db_manager in kiosks]
+            inserted = [0] * len(clients)
+
+            def run(index):
+                inserted[index] = clients[index].sync()
+                kiosks[index].release_connection()
+
+            threads = [threading.Thread(target=run, args=(i,)) for i in range(len(clients))]
+            start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - start
+
+            # Resending an acknowledged batch must not add rows
+            resent = clients[0].send([row[1:] for row in kiosks[0].execute(
+                "SELECT 0, result_uid, username, test_mode, test_value, difficulty, wpm, accuracy, errors, "
+                "correct_chars, total_chars, test_duration, timestamp FROM test_results LIMIT ?",
+                (args.batch_size,)).fetchall()])
+
+            total = args.kiosks * args.results
+            report = {
+                "kiosks": args.kiosks,
+                "results": total,
+                "inserted": sum(inserted),
+                "unsynced": sum(db_manager.count_unsynced() for db_manager in kiosks),
+                "resent_inserted": resent,
+                "elapsed_s": elapsed,
+                "results_per_s": total / elapsed
+            }
+            for db_manager in kiosks:
+                db_manager.close()
+        finally:
+            server.terminate()
+            server.wait()
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import itertools
+
+import numpy as np
+
+# Most points drawn per line; longer histories are downsampled to this
+MAX_POINTS = 1000
+
+# Seconds per aggregation bucket
+PERIODS = {
+    "day": 86400,
+    "week": 7 * 86400
+}
+
+# 1970-01-01 was a Thursday; shifting by three days makes weeks start on Monday
+WEEK_OFFSET = 3 * 86400
+
+class ProgressData:
+    """A user's test history as NumPy columns, ordered by time.
+
+    times holds UNIX timestamps in seconds; wpm and accuracy are float arrays.
+    """
+
+    __slots__ = ("times", "wpm", "accuracy")
+
+    def __init__(self, times, wpm, accuracy):
+        self.times = times
+        self.wpm = wpm
+        self.accuracy = accuracy
+
+    def __len__(self):
+        return len(self.times)
+
+    def column(self, data_type):
+        """Get the wpm or accuracy column"""
+        return self.wpm if data_type == "wpm" else self.accuracy
+
+    def dates(self, times=None):
+        """Timestamps as datetime64 values, which matplotlib plots directly"""
+        return (self.times if times is None else times).astype("datetime64[s]")
+
+    def aggregate(self, period):
+        """Average the tests of each day or week, returning a new ProgressData"""
+        if period not in PERIODS or not len(self):
+            return self
+        size = PERIODS[period]
+        offset = WEEK_OFFSET if period == "week" else 0
+
+        # Times are sorted, so bucket numbers are too and each bucket is one run
+        buckets = (self.times.astype(np.int64) + offset) // size
+        starts = np.flatnonzero(np.diff(buckets, prepend=buckets[0] - 1))
+        counts = np.diff(np.append(starts, len(buckets)))
+        return ProgressData(
+            buckets[starts] * size - offset,
+            np.add.reduceat(self.wpm, starts) / counts,
+            np.add.reduceat(self.accuracy, starts) / counts
+        )
+
+def load_progress(db_manager, username):
+    """Load a user's history straight into arrays.
+
+    SQLite converts the timestamps to UNIX time, so no row is parsed in Python.
+    The query is answered from idx_test_results_user_time alone.
+    """
+    rows = db_manager.execute('''
+    SELECT CAST(strftime('%s', timestamp) AS INTEGER), COALESCE(wpm, 0), COALESCE(accuracy, 0)
+    FROM test_results 
+    WHERE username = ? AND timestamp IS NOT NULL 
+    ORDER BY timestamp ASC
+    ''', (username,)).fetchall()
+
+    columns = np.fromiter(itertools.chain.from_iterable(rows), dtype=np.float64,
+                          count=3 * len(rows)).reshape(-1, 3)
+    return ProgressData(columns[:, 0].astype(np.int64), columns[:, 1], columns[:, 2])
+
+def lttb(x, y, threshold=MAX_POINTS):
+    """Largest-Triangle-Three-Buckets downsampling, returning the kept indices.
+
+    Keeps the first and last points and, from each bucket in between, the
+    point forming the largest triangle with the previously kept point and
+    the average of the next bucket. Peaks and dips survive, unlike plain
+    striding or averaging.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    previous = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        # Average of the following bucket (the last point for the final bucket)
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        next_x = x[end:next_end].mean()
+        next_y = y[end:next_end].mean()
+
+        # Twice the triangle areas; the factor does not change the argmax
+        areas = np.abs((x[previous] - next_x) * (y[start:end] - y[previous])
+                       - (x[previous] - x[start:end]) * (next_y - y[previous]))
+        previous = start + int(np.argmax(areas))
+        selected[i + 1] = previous
+    return selected
+
+def trend(values):
+    """Slope and intercept of a least-squares line through values, per test"""
+    if len(values) < 2:
+        return 0.0, float(values[0]) if len(values) else 0.0
+    slope, intercept = np.polyfit(np.arange(len(values), dtype=np.float64), values, 1)
+    return float(slope), float(intercept)
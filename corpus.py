@@ -0,0 +1,189 @@
+import hashlib
+import itertools
+import random
+import sys
+import unicodedata
+from array import array
+from collections import Counter, deque
+
+# Used when the database has no words for a difficulty
+FALLBACK_WORDS = ["the", "be", "to", "of", "and", "a", "in", "that", "have", "I",
+                  "it", "for", "not", "on", "with", "he", "as", "you", "do", "at"]
+
+# Typographic characters that can't be typed on a plain keyboard
+REPLACEMENTS = str.maketrans({
+    "\u2018": "'", "\u2019": "'", "\u201c": '"', "\u201d": '"',
+    "\u2013": "-", "\u2014": "-", "\u2026": "..."
+})
+
+def normalize_text(text):
+    """Normalize unicode, typographic punctuation and whitespace"""
+    text = unicodedata.normalize("NFKC", text).translate(REPLACEMENTS)
+    return " ".join(text.split())
+
+def content_hash(text):
+    """Hash of normalized text, used to deduplicate paragraphs"""
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+class WordList:
+    """Immutable word list of one difficulty with precomputed sampling tables.
+
+    Words are interned and stored once each; repeats in the source list
+    become frequency weights, kept as cumulative weights for weighted draws.
+    """
+
+    __slots__ = ("unique_words", "cum_weights", "total")
+
+    def __init__(self, words):
+        counts = Counter(sys.intern(word) for word in words)
+        self.unique_words = tuple(counts)
+        self.cum_weights = tuple(itertools.accumulate(counts.values()))
+        self.total = self.cum_weights[-1] if self.cum_weights else 0
+
+    def __len__(self):
+        return len(self.unique_words)
+
+    def choices(self, k, rng=random):
+        """Draw k words with replacement, weighted by frequency"""
+        return rng.choices(self.unique_words, cum_weights=self.cum_weights, k=k)
+
+    def sample(self, k, rng=random):
+        """Draw k distinct words, repeating weighted draws if the list is too short"""
+        selected = rng.sample(self.unique_words, min(k, len(self.unique_words)))
+        if len(selected) < k:
+            selected.extend(self.choices(k - len(selected), rng))
+        return selected
+
+def table_version(db_manager, table):
+    """Current change counter of a corpus table, maintained by triggers"""
+    row = db_manager.execute(
+        "SELECT version FROM corpus_version WHERE name = ?", (table,)
+    ).fetchone()
+    return row[0] if row else 0
+
+class WordCorpus:
+    """Per-difficulty word lists loaded once from word_lists and cached.
+
+    The cache is dropped whenever the corpus version in the database
+    changes, which triggers on word_lists keep up to date.
+    """
+
+    def __init__(self, db_manager):
+        self.db_manager = db_manager
+        self.word_lists = {}
+        self.version = None
+
+    def get(self, difficulty):
+        """Get the word list of a difficulty level, loading it on first use"""
+        version = table_version(self.db_manager, "word_lists")
+        if version != self.version:
+            self.word_lists = {}
+            self.version = version
+
+        word_list = self.word_lists.get(difficulty)
+        if word_list is None:
+            word_list = self.load(difficulty)
+            self.word_lists[difficulty] = word_list
+        return word_list
+
+    def load(self, difficulty):
+        """Read and index every word list row of a difficulty level"""
+        self.db_manager.execute(
+            "SELECT words FROM word_lists WHERE difficulty = ? ORDER BY id",
+            (difficulty,)
+        )
+        rows = self.db_manager.cursor.fetchall()
+        words = itertools.chain.from_iterable(row[0].split() for row in rows)
+        word_list = WordList(words)
+        if not word_list:
+            word_list = WordList(FALLBACK_WORDS)
+        return word_list
+
+    def words_text(self, difficulty, count):
+        """Text of count distinct words, for word-count tests"""
+        return " ".join(self.get(difficulty).sample(count))
+
+    def random_text(self, difficulty, count):
+        """Text of count frequency-weighted random words"""
+        return " ".join(self.get(difficulty).choices(count))
+
+    def stream(self, difficulty, chunk_words=30):
+        """Endless frequency-weighted random words, yielded as text chunks.
+
+        Every chunk after the first starts with a space, so the chunks can be
+        appended to each other as they are consumed. The word list (and its
+        version in the database) is looked up once, for the first chunk, so
+        later chunks drawn during a test do no database work.
+        """
+        word_list = self.get(difficulty)
+        separator = ""
+        while True:
+            yield separator + " ".join(word_list.choices(chunk_words))
+            separator = " "
+
+class ParagraphPicker:
+    """Pick random paragraphs in O(1) from a cached id index per difficulty.
+
+    Each user's recently seen paragraphs are kept in a bounded history and
+    avoided while other paragraphs are available. The id index is reloaded
+    when paragraphs are inserted or deleted.
+    """
+
+    def __init__(self, db_manager, recent_limit=20, max_attempts=8):
+        self.db_manager = db_manager
+        self.recent_limit = recent_limit
+        self.max_attempts = max_attempts
+        self.paragraph_ids = {}
+        self.version = None
+        # (username, difficulty) -> (deque of ids in order seen, set of the same ids)
+        self.recent = {}
+
+    def ids(self, difficulty):
+        """Get the paragraph ids of a difficulty level, loading them on first use"""
+        version = table_version(self.db_manager, "paragraphs")
+        if version != self.version:
+            self.paragraph_ids = {}
+            self.version = version
+
+        ids = self.paragraph_ids.get(difficulty)
+        if ids is None:
+            # Covered by idx_paragraphs_difficulty, no paragraph text is read
+            self.db_manager.execute(
+                "SELECT id FROM paragraphs WHERE difficulty = ?", (difficulty,)
+            )
+            ids = array("q", (row[0] for row in self.db_manager.cursor.fetchall()))
+            self.paragraph_ids[difficulty] = ids
+        return ids
+
+    def remember(self, username, difficulty, paragraph_id):
+        """Add a paragraph to the user's bounded recent history"""
+        history, seen = self.recent.setdefault((username, difficulty), (deque(), set()))
+        history.append(paragraph_id)
+        seen.add(paragraph_id)
+        while len(history) > self.recent_limit:
+            seen.discard(history.popleft())
+
+    def pick(self, difficulty, username=None):
+        """Get the text of a random paragraph the user has not seen recently"""
+        history, seen = self.recent.get((username, difficulty), ((), ()))
+        for attempt in range(self.max_attempts):
+            ids = self.ids(difficulty)
+            if not ids:
+                return ""
+
+            paragraph_id = ids[random.randrange(len(ids))]
+            # Recent paragraphs are skipped unless there is nothing else to show
+            if paragraph_id in seen and len(ids) > len(seen) and attempt < self.max_attempts - 1:
+                continue
+
+            row = self.db_manager.execute(
+                "SELECT content FROM paragraphs WHERE id = ?", (paragraph_id,)
+            ).fetchone()
+            if row is None:
+                # Deleted since the index was loaded
+                self.paragraph_ids.pop(difficulty, None)
+                continue
+
+            self.remember(username, difficulty, paragraph_id)
+            return row[0]
+        return ""
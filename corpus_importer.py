@@ -0,0 +1,236 @@
+import argparse
+import os
+import re
+import time
+
+import numpy as np
+
+from corpus import normalize_text, content_hash
+from database_manager import DatabaseManager
+
+DIFFICULTIES = ("beginner", "intermediate", "advanced")
+
+# Score thresholds between beginner/intermediate and intermediate/advanced
+PARAGRAPH_THRESHOLDS = (6.5, 8.8)
+WORD_THRESHOLDS = (8.0, 14.0)
+
+WORD_PATTERN = re.compile(r"[A-Za-z]+(?:'[A-Za-z]+)?")
+
+# Byte lookup tables for the vectorized character features
+VOWELS = np.zeros(256, dtype=bool)
+VOWELS[list(b"aeiouyAEIOUY")] = True
+COMMON_CHARS = np.zeros(256, dtype=bool)
+COMMON_CHARS[list(b"abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ .,'")] = True
+
+def iter_text_files(paths):
+    """Yield the .txt files named by paths, descending into directories"""
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    if name.lower().endswith(".txt"):
+                        yield os.path.join(root, name)
+        else:
+            yield path
+
+def iter_passages(paths, min_words=15, max_words=150):
+    """Stream normalized passages (blank-line separated blocks) from text files"""
+    for file_path in iter_text_files(paths):
+        with open(file_path, encoding="utf-8", errors="replace") as file:
+            lines = []
+            for line in file:
+                if line.strip():
+                    lines.append(line)
+                    continue
+                if lines:
+                    passage = normalize_text(" ".join(lines))
+                    lines = []
+                    if min_words <= passage.count(" ") + 1 <= max_words:
+                        yield passage
+            if lines:
+                passage = normalize_text(" ".join(lines))
+                if min_words <= passage.count(" ") + 1 <= max_words:
+                    yield passage
+
+def iter_words(paths):
+    """Stream words from text files, as written (see fold_word)"""
+    for file_path in iter_text_files(paths):
+        with open(file_path, encoding="utf-8", errors="replace") as file:
+            for line in file:
+                yield from WORD_PATTERN.findall(normalize_text(line))
+
+def fold_word(word):
+    """Lowercase a word, returning (word, may_be_name).
+
+    Lowercase and all-caps words are ordinary words. Capitalized words
+    may be names, or just start a sentence.
+    """
+    folded = word.lower()
+    return folded, word != folded and not (len(word) > 1 and word.isupper())
+
+def char_features(texts):
+    """Per-text length, space count, vowel-group count and rare-character count.
+
+    The texts are joined into one byte buffer and every feature is computed
+    with array operations over it, summed per text with reduceat.
+    """
+    # Non-ASCII characters become "?" and count as rare; "\n" separates the texts
+    codes = np.frombuffer("\n".join(texts).encode("ascii", "replace"), dtype=np.uint8)
+    lengths = np.fromiter(map(len, texts), dtype=np.int64, count=len(texts))
+    starts = np.concatenate(([0], np.cumsum(lengths + 1)[:-1]))
+
+    vowels = VOWELS[codes]
+    group_starts = vowels.copy()
+    group_starts[1:] &= ~vowels[:-1]
+
+    spaces = np.add.reduceat((codes == 32).astype(np.int64), starts)
+    syllables = np.add.reduceat(group_starts.astype(np.int64), starts)
+    rare = np.add.reduceat((~COMMON_CHARS[codes]).astype(np.int64), starts)
+    rare[:-1] -= 1  # The separator after each text
+    return lengths, spaces, syllables, rare
+
+def score_passages(passages):
+    """Difficulty scores for a batch of passages.
+
+    The score adds mean word length, estimated syllables per word and a
+    weighted rate of characters outside plain letters and basic punctuation.
+    """
+    lengths, spaces, syllables, rare = char_features(passages)
+    word_counts = spaces + 1
+    letters = lengths - spaces
+    return letters / word_counts + syllables / word_counts + 20.0 * rare / lengths
+
+def score_words(words):
+    """Difficulty scores for a batch of words: length plus estimated syllables"""
+    lengths, spaces, syllables, rare = char_features(words)
+    return lengths + syllables
+
+def classify(scores, thresholds):
+    """Map scores to difficulty names"""
+    return [DIFFICULTIES[i] for i in np.digitize(scores, thresholds)]
+
+class CorpusImporter:
+    """Bulk-load word lists and paragraphs from local text files.
+
+    Content is normalized, deduplicated by hash and sorted into difficulty
+    levels, then inserted with executemany in large transactions.
+    """
+
+    def __init__(self, db_manager, batch_size=10000, words_per_row=5000):
+        self.db_manager = db_manager
+        self.batch_size = batch_size
+        self.words_per_row = words_per_row
+
+    def import_paragraphs(self, paths, min_words=15, max_words=150):
+        """Import passages, returning counts of passages read and inserted per difficulty"""
+        stats = {"read": 0, "inserted": 0}
+        stats.update({difficulty: 0 for difficulty in DIFFICULTIES})
+
+        batch = []
+        for passage in iter_passages(paths, min_words, max_words):
+            batch.append(passage)
+            if len(batch) >= self.batch_size:
+                self._insert_paragraphs(batch, stats)
+                batch = []
+        if batch:
+            self._insert_paragraphs(batch, stats)
+        return stats
+
+    def _insert_paragraphs(self, passages, stats):
+        """Score and insert one batch of passages"""
+        difficulties = classify(score_passages(passages), PARAGRAPH_THRESHOLDS)
+        by_difficulty = {difficulty: [] for difficulty in DIFFICULTIES}
+        for difficulty, passage in zip(difficulties, passages):
+            by_difficulty[difficulty].append((difficulty, passage, content_hash(passage)))
+
+        with self.db_manager.transaction() as cursor:
+            for difficulty, rows in by_difficulty.items():
+                # Duplicates are dropped by the unique index on content_hash
+                cursor.executemany(
+                    "INSERT OR IGNORE INTO paragraphs (difficulty, content, content_hash) VALUES (?, ?, ?)",
+                    rows
+                )
+                stats[difficulty] += max(cursor.rowcount, 0)
+                stats["inserted"] += max(cursor.rowcount, 0)
+        stats["read"] += len(passages)
+
+    def import_words(self, paths):
+        """Import words, returning counts of words read and inserted per difficulty"""
+        stats = {"read": 0, "inserted": 0}
+        stats.update({difficulty: 0 for difficulty in DIFFICULTIES})
+
+        # Word lists are small enough to dedupe against in memory
+        self.db_manager.execute("SELECT words FROM word_lists")
+        known = set()
+        for row in self.db_manager.cursor.fetchall():
+            known.update(row[0].lower().split())
+
+        # Capitalized words are held back until they are also seen in lowercase
+        maybe_names = set()
+        batch = []
+        for word in iter_words(paths):
+            stats["read"] += 1
+            word, may_be_name = fold_word(word)
+            if word in known:
+                continue
+            if may_be_name:
+                maybe_names.add(word)
+                continue
+            known.add(word)
+            batch.append(word)
+            if len(batch) >= self.batch_size:
+                self._insert_words(batch, stats)
+                batch = []
+        if batch:
+            self._insert_words(batch, stats)
+
+        # Words only ever seen capitalized are most likely names
+        stats["names"] = len(maybe_names - known)
+        return stats
+
+    def _insert_words(self, words, stats):
+        """Score one batch of words and store it as word_lists rows"""
+        by_difficulty = {difficulty: [] for difficulty in DIFFICULTIES}
+        for difficulty, word in zip(classify(score_words(words), WORD_THRESHOLDS), words):
+            by_difficulty[difficulty].append(word)
+
+        rows = []
+        for difficulty, difficulty_words in by_difficulty.items():
+            stats[difficulty] += len(difficulty_words)
+            for start in range(0, len(difficulty_words), self.words_per_row):
+                rows.append((difficulty, " ".join(difficulty_words[start:start + self.words_per_row])))
+
+        with self.db_manager.transaction() as cursor:
+            cursor.executemany("INSERT INTO word_lists (difficulty, words) VALUES (?, ?)", rows)
+        stats["inserted"] += len(words)
+
+def main():
+    parser = argparse.ArgumentParser(description="Import word lists or paragraphs into the TypeMaster database")
+    parser.add_argument("paths", nargs="+", help="text files or directories of .txt files")
+    parser.add_argument("--words", action="store_true", help="import individual words instead of paragraphs")
+    parser.add_argument("--db", default="typing_data.db", help="database file (default: typing_data.db)")
+    parser.add_argument("--batch-size", type=int, default=10000, help="rows per transaction")
+    parser.add_argument("--min-words", type=int, default=15, help="shortest passage to keep")
+    parser.add_argument("--max-words", type=int, default=150, help="longest passage to keep")
+    args = parser.parse_args()
+
+    db_manager = DatabaseManager(args.db)
+    db_manager.setup_database()
+    importer = CorpusImporter(db_manager, batch_size=args.batch_size)
+
+    start = time.perf_counter()
+    if args.words:
+        stats = importer.import_words(args.paths)
+    else:
+        stats = importer.import_paragraphs(args.paths, args.min_words, args.max_words)
+    elapsed = time.perf_counter() - start
+    db_manager.close()
+
+    print(f"Read {stats['read']}, inserted {stats['inserted']} in {elapsed:.1f}s "
+          f"(beginner {stats['beginner']}, intermediate {stats['intermediate']}, advanced {stats['advanced']})")
+    if "names" in stats:
+        print(f"Skipped {stats['names']} words only seen capitalized")
+
+if __name__ == "__main__":
+    main()
@@ -1,65 +1,132 @@
 import sqlite3
-import csv
+import random
+import threading
+import time
+import uuid
+from contextlib import contextmanager
 from datetime import datetime
+from migrations import MigrationRunner, LEADERBOARD_UPSERT, USER_STATS_UPSERT
+from result_exporter import ResultExporter
+from corpus import WordCorpus, ParagraphPicker
+
+# Columns of a result as exchanged with the sync server
+SYNC_FIELDS = ("result_uid", "username", "test_mode", "test_value", "difficulty", "wpm", "accuracy",
+               "errors", "correct_chars", "total_chars", "test_duration", "timestamp")
+
+# Columns of test_latency, keyed like LatencyMonitor.summary()
+LATENCY_FIELDS = ("keys", "input_p50_ms", "input_p95_ms", "input_p99_ms", "input_max_ms",
+                  "lag_p50_ms", "lag_p95_ms", "lag_p99_ms", "lag_max_ms", "stalls")
 
 class DatabaseManager:
-    def __init__(self, db_file):
-        """Initialize the database connection"""
+    def __init__(self, db_file, synchronous="NORMAL", busy_timeout=5000, max_retries=5, retry_delay=0.05):
+        """Initialize the database connection settings.
+
+        Each thread gets its own connection, opened lazily in WAL mode with
+        the given synchronous and busy_timeout (milliseconds) pragmas.
+        Statements that still hit a locked database are retried up to
+        max_retries times with exponential backoff starting at retry_delay.
+        """
         self.db_file = db_file
-        self.conn = sqlite3.connect(db_file)
-        self.cursor = self.conn.cursor()
-    
-    def setup_database(self):
-        """Create necessary tables if they don't exist"""
-        # Create test_results table
-        self.cursor.execute('''
-        CREATE TABLE IF NOT EXISTS test_results (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT,
-            test_mode TEXT,
-            difficulty TEXT,
-            wpm REAL,
-            accuracy REAL,
-            errors INTEGER,
-            correct_chars INTEGER,
-            total_chars INTEGER,
-            test_duration REAL,
-            timestamp TEXT DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (username) REFERENCES users (username)
-        )
-        ''')
+        self.synchronous = synchronous
+        self.busy_timeout = busy_timeout
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
         
-        # Create words table for word lists
-        self.cursor.execute('''
-        CREATE TABLE IF NOT EXISTS word_lists (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            difficulty TEXT,
-            words TEXT
-        )
-        ''')
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
         
-        # Create paragraphs table
-        self.cursor.execute('''
-        CREATE TABLE IF NOT EXISTS paragraphs (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            difficulty TEXT,
-            content TEXT
-        )
-        ''')
-        
-        self.conn.commit()
-        
-        # Initialize with default word lists if empty
-        self.cursor.execute("SELECT COUNT(*) FROM word_lists")
-        if self.cursor.fetchone()[0] == 0:
-            self.initialize_word_lists()
-            
-        # Initialize with default paragraphs if empty
-        self.cursor.execute("SELECT COUNT(*) FROM paragraphs")
-        if self.cursor.fetchone()[0] == 0:
-            self.initialize_paragraphs()
+
+        # Word lists are indexed in memory once per difficulty
+        self.word_corpus = WordCorpus(self)
+        self.paragraph_picker = ParagraphPicker(self)
     
-    def initialize_word_lists(self):
+    def connect(self):
+        """Open a new connection with the configured pragmas"""
+        conn = sqlite3.connect(self.db_file, timeout=self.busy_timeout / 1000.0,
+                               check_same_thread=False)
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout)}")
+        self._retry(conn.execute, "PRAGMA journal_mode = WAL")
+        conn.execute(f"PRAGMA synchronous = {self.synchronous}")
+        return conn
+    
+    @property
+    def conn(self):
+        """Connection owned by the calling thread"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self.connect()
+            self._local.conn = conn
+            self._local.cursor = conn.cursor()
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+    
+    @property
+    def cursor(self):
+        """Cursor owned by the calling thread"""
+        self.conn
+        return self._local.cursor
+    
+    def _is_locked_error(self, error):
+        """Check whether an error was caused by contention on the database"""
+        message = str(error).lower()
+        return "locked" in message or "busy" in message
+    
+    def _retry(self, func, *args):
+        """Call func, retrying with exponential backoff while the database is locked"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                return func(*args)
+            except sqlite3.OperationalError as e:
+                if attempt == self.max_retries or not self._is_locked_error(e):
+                    raise
+                # Jitter keeps competing instances from retrying in lockstep
+                time.sleep(self.retry_delay * (2 ** attempt) * random.uniform(0.5, 1.5))
+    
+    def execute(self, query, params=()):
+        """Execute a statement on this thread's cursor and return the cursor"""
+        cursor = self.cursor
+        self._retry(cursor.execute, query, params)
+        return cursor
+    
+    def executemany(self, query, rows):
+        """Execute a statement for every row on this thread's cursor"""
+        cursor = self.cursor
+        self._retry(cursor.executemany, query, rows)
+        return cursor
+    
+    def commit(self):
+        """Commit this thread's current transaction"""
+        self._retry(self.conn.commit)
+    
+    @contextmanager
+    def transaction(self):
+        """Run a block of statements as one write transaction.
+
+        BEGIN IMMEDIATE takes the write lock up front, so a transaction never
+        has to upgrade a read lock and fail half-way under contention.
+        """
+        conn = self.conn
+        if conn.in_transaction:
+            conn.commit()
+        self._retry(conn.execute, "BEGIN IMMEDIATE")
+        try:
+            yield self.cursor
+        except BaseException:
+            conn.rollback()
+            raise
+        self._retry(conn.commit)
+    
+    def setup_database(self):
+        """Create or upgrade the schema.
+
+        Returns immediately when the schema is already current, so startup
+        skips all DDL and seeding checks.
+        """
+        return MigrationRunner(self).run()
+    
+    def initialize_word_lists(self, cursor):
         """Initialize default word lists for different difficulty levels"""
         beginner_words = "the and that have with this from they will each about how some her more would first also their one what other word were many these their she your them then state would like time been when two could made over did more years some most only into used year must such now any than last own see work out part even new just day are after where most here both between life being under never".replace(",", "")
         
@@ -67,15 +134,14 @@ class DatabaseManager:
         
         advanced_words = "notwithstanding nevertheless consequently simultaneously approximately extraordinary sophisticated characteristics implementation particularly significantly unfortunately recommendation standardization administration characteristics representatives acknowledgment opportunities responsibility questionnaire categorically implementation understanding contradictory sophisticated approximately unfortunately transcendental misconception authorization disproportionately extraordinarily indistinguishable characteristics constitutional interpretation philosophical psychological extraordinary differentiation recommendation disestablishment epistemological extraterritorial phenomenological representational biodiversity representative environmentally incomprehensible".replace(",", "")
         
-        self.cursor.execute("INSERT INTO word_lists (difficulty, words) VALUES (?, ?)", 
-                         ("beginner", beginner_words))
-        self.cursor.execute("INSERT INTO word_lists (difficulty, words) VALUES (?, ?)", 
-                         ("intermediate", intermediate_words))
-        self.cursor.execute("INSERT INTO word_lists (difficulty, words) VALUES (?, ?)", 
-                         ("advanced", advanced_words))
-        self.conn.commit()
-    
-    def initialize_paragraphs(self):
+        cursor.execute("INSERT INTO word_lists (difficulty, words) VALUES (?, ?)", 
+                       ("beginner", beginner_words))
+        cursor.execute("INSERT INTO word_lists (difficulty, words) VALUES (?, ?)", 
+                       ("intermediate", intermediate_words))
+        cursor.execute("INSERT INTO word_lists (difficulty, words) VALUES (?, ?)", 
+                       ("advanced", advanced_words))
+    
+    def initialize_paragraphs(self, cursor):
         """Initialize default paragraphs for different difficulty levels"""
         beginner = "The quick brown fox jumps over the lazy dog. She sells sea shells by the sea shore. How much wood would a woodchuck chuck if a woodchuck could chuck wood? All good things must come to an end. Early to bed and early to rise makes a man healthy, wealthy and wise."
         
@@ -83,74 +149,167 @@ class DatabaseManager:
         
         advanced = "The proliferation of artificial intelligence in contemporary society represents a paradigm shift in how humans interact with technology. The philosophical implications of machine learning algorithms that can adapt, predict, and potentially surpass human decision-making capabilities raises profound questions about consciousness, free will, and the nature of intelligence itself. Furthermore, the socioeconomic ramifications of widespread automation necessitate careful consideration of workforce displacement, wealth distribution, and the redefinition of labor in a post-industrial economy. While proponents emphasize efficiency gains and novel problem-solving approaches, critics caution against exacerbating inequality and diminishing human agency in critical domains."
         
-        self.cursor.execute("INSERT INTO paragraphs (difficulty, content) VALUES (?, ?)", 
-                         ("beginner", beginner))
-        self.cursor.execute("INSERT INTO paragraphs (difficulty, content) VALUES (?, ?)", 
-                         ("intermediate", intermediate))
-        self.cursor.execute("INSERT INTO paragraphs (difficulty, content) VALUES (?, ?)", 
-                         ("advanced", advanced))
-        self.conn.commit()
+        cursor.execute("INSERT INTO paragraphs (difficulty, content) VALUES (?, ?)", 
+                       ("beginner", beginner))
+        cursor.execute("INSERT INTO paragraphs (difficulty, content) VALUES (?, ?)", 
+                       ("intermediate", intermediate))
+        cursor.execute("INSERT INTO paragraphs (difficulty, content) VALUES (?, ?)", 
+                       ("advanced", advanced))
     
     def get_words(self, difficulty):
-        """Get word list for a specific difficulty level"""
-        self.cursor.execute("SELECT words FROM word_lists WHERE difficulty = ?", 
-                         (difficulty,))
-        result = self.cursor.fetchone()
-        if result:
-            return result[0].split()
-        return []
-    
-    def get_paragraph(self, difficulty):
-        """Get a random paragraph for a specific difficulty level"""
-        self.cursor.execute("SELECT content FROM paragraphs WHERE difficulty = ? ORDER BY RANDOM() LIMIT 1", 
-                         (difficulty,))
-        result = self.cursor.fetchone()
-        if result:
-            return result[0]
-        return ""
-    
-    def save_test_results(self, username, mode, difficulty, wpm, accuracy, errors, correct_chars, total_chars, test_duration):
-        """Save test results to database"""
-        self.cursor.execute('''
-        INSERT INTO test_results 
-        (username, test_mode, difficulty, wpm, accuracy, errors, correct_chars, total_chars, test_duration, timestamp) 
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (username, mode, difficulty, wpm, accuracy, errors, correct_chars, total_chars, test_duration, datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
-        self.conn.commit()
-        
-        # Get the ID of the inserted row
-        test_id = self.cursor.lastrowid
-        
-        # Update user stats if not guest
-        if username != "guest":
-            self.cursor.execute(
-                """SELECT tests_completed, avg_wpm, avg_accuracy FROM users WHERE username = ?""",
-                (username,)
-            )
-            stats = self.cursor.fetchone()
+        """Get the distinct words of a difficulty level from the cached corpus"""
+        return list(self.word_corpus.get(difficulty).unique_words)
+    
+    def get_paragraph(self, difficulty, username=None):
+        """Get a random paragraph for a specific difficulty level, avoiding ones the user saw recently"""
+        return self.paragraph_picker.pick(difficulty, username)
+    
+    def save_test_results(self, username, mode, difficulty, wpm, accuracy, errors, correct_chars, total_chars, test_duration, value=None, latency=None):
+        """Save test results to database, with the LatencyMonitor summary if given"""
+        with self.transaction() as cursor:
+            cursor.execute('''
+            INSERT INTO test_results 
+            (username, test_mode, test_value, difficulty, wpm, accuracy, errors, correct_chars, total_chars, test_duration, timestamp, result_uid) 
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (username, mode, value, difficulty, wpm, accuracy, errors, correct_chars, total_chars, test_duration, datetime.now().strftime("%Y-%m-%d %H:%M:%S"), uuid.uuid4().hex))
             
-            if stats:
-                tests_completed, avg_wpm, avg_accuracy = stats
-                tests_completed += 1
-                
-                # Calculate new averages
-                new_avg_wpm = ((avg_wpm * (tests_completed - 1)) + wpm) / tests_completed
-                new_avg_accuracy = ((avg_accuracy * (tests_completed - 1)) + accuracy) / tests_completed
-                
-                # Update user stats
-                self.cursor.execute(
-                    """UPDATE users 
-                       SET tests_completed = ?, avg_wpm = ?, avg_accuracy = ? 
-                       WHERE username = ?""",
-                    (tests_completed, new_avg_wpm, new_avg_accuracy, username)
+            # Get the ID of the inserted row
+            test_id = cursor.lastrowid
+            
+
+            # Input latency measured during the test
+            if latency:
+                cursor.execute(
+                    f"INSERT INTO test_latency (test_id, {', '.join(LATENCY_FIELDS)}) VALUES (?{', ?' * len(LATENCY_FIELDS)})",
+                    (test_id, *(latency[field] for field in LATENCY_FIELDS))
                 )
-                self.conn.commit()
+            
+            # Keep the user's best results per mode and time window
+            cursor.execute(LEADERBOARD_UPSERT, (test_id - 1, test_id))
+            
+            # Running aggregates per mode
+            cursor.execute(USER_STATS_UPSERT, (test_id - 1, test_id))
+            
+            # Update user stats if not guest
+            if username != "guest":
+                self.update_user_stats(username, wpm, accuracy, cursor)
         
         return test_id
     
+    def update_user_stats(self, username, wpm, accuracy, cursor=None):
+        """Add a test to a user's totals with a single UPDATE.
+        
+        The new averages are computed by SQLite from the stored values, so
+        concurrent saves cannot overwrite each other's counts. Pass the
+        cursor of an open transaction to update as part of it.
+        """
+        if cursor is None:
+            with self.transaction() as cursor:
+                self.update_user_stats(username, wpm, accuracy, cursor)
+            return
+        
+        cursor.execute('''
+        UPDATE users 
+        SET tests_completed = COALESCE(tests_completed, 0) + 1, 
+            avg_wpm = (COALESCE(avg_wpm, 0) * COALESCE(tests_completed, 0) + ?) / (COALESCE(tests_completed, 0) + 1), 
+            avg_accuracy = (COALESCE(avg_accuracy, 0) * COALESCE(tests_completed, 0) + ?) / (COALESCE(tests_completed, 0) + 1) 
+        WHERE username = ?
+        ''', (wpm, accuracy, username))
+    
+    def is_admin(self, username):
+        """Whether a user may use admin features such as exporting all users"""
+        row = self.execute("SELECT is_admin FROM users WHERE username = ?", (username,)).fetchone()
+        return bool(row and row[0])
+    
+    def set_admin(self, username, admin=True):
+        """Grant or revoke admin rights, returning False if the user does not exist"""
+        with self.transaction() as cursor:
+            cursor.execute("UPDATE users SET is_admin = ? WHERE username = ?", (int(admin), username))
+            return cursor.rowcount > 0
+    
+    def get_user_aggregates(self, username):
+        """Get a user's per-mode aggregates as dicts with count, averages, spread and best WPM"""
+        self.execute('''
+        SELECT test_mode, tests, sum_wpm, sum_wpm_sq, sum_accuracy, best_wpm 
+        FROM user_stats 
+        WHERE username = ? 
+        ORDER BY tests DESC
+        ''', (username,))
+        aggregates = []
+        for mode, tests, sum_wpm, sum_wpm_sq, sum_accuracy, best_wpm in self.cursor.fetchall():
+            mean_wpm = sum_wpm / tests if tests else 0.0
+            variance = max(sum_wpm_sq / tests - mean_wpm * mean_wpm, 0.0) if tests else 0.0
+            aggregates.append({
+                "mode": mode,
+                "tests": tests,
+                "avg_wpm": mean_wpm,
+                "wpm_stddev": variance ** 0.5,
+                "avg_accuracy": sum_accuracy / tests if tests else 0.0,
+                "best_wpm": best_wpm
+            })
+        return aggregates
+    
+    def import_results(self, batches):
+        """Bulk insert batches of results from other installs in one transaction.
+
+        Rows are tuples in SYNC_FIELDS order. Results whose result_uid is
+        already stored are skipped, so a batch can safely be sent twice.
+        Returns the number of new results in each batch.
+        """
+        inserted = []
+        with self.transaction() as cursor:
+            first_id = cursor.execute("SELECT COALESCE(MAX(id), 0) FROM test_results").fetchone()[0]
+            for rows in batches:
+                cursor.executemany(f'''
+                INSERT OR IGNORE INTO test_results ({", ".join(SYNC_FIELDS)}) 
+                VALUES ({", ".join("?" * len(SYNC_FIELDS))})
+                ''', rows)
+                inserted.append(max(cursor.rowcount, 0))
+            last_id = cursor.execute("SELECT COALESCE(MAX(id), 0) FROM test_results").fetchone()[0]
+            
+            # The write lock keeps the new rows in one id range
+            if last_id > first_id:
+                cursor.execute(LEADERBOARD_UPSERT, (first_id, last_id))
+                cursor.execute(USER_STATS_UPSERT, (first_id, last_id))
+        
+        return inserted
+    
+    def get_sync_batch(self, limit=500):
+        """Get the oldest results not yet synced as (test_id, SYNC_FIELDS...) rows.
+        
+        Results past the sync_state watermark are unsynced, so nothing is
+        queued per result and installs that never sync store nothing extra.
+        """
+        self.execute(f'''
+        SELECT id, {", ".join(SYNC_FIELDS)} 
+        FROM test_results 
+        WHERE id > (SELECT last_synced_id FROM sync_state) 
+        ORDER BY id 
+        LIMIT ?
+        ''', (limit,))
+        return self.cursor.fetchall()
+    
+    def mark_synced(self, last_test_id):
+        """Move the sync watermark up to last_test_id once the server has those results"""
+        with self.transaction() as cursor:
+            cursor.execute("UPDATE sync_state SET last_synced_id = MAX(last_synced_id, ?)", (last_test_id,))
+    
+    def count_unsynced(self):
+        """Number of results waiting to be synced"""
+        return self.execute(
+            "SELECT COUNT(*) FROM test_results WHERE id > (SELECT last_synced_id FROM sync_state)"
+        ).fetchone()[0]
+    
+    def get_test_latency(self, test_id):
+        """Input latency summary of a test as a dict, or None if it was not measured"""
+        row = self.execute(
+            f"SELECT {', '.join(LATENCY_FIELDS)} FROM test_latency WHERE test_id = ?", (test_id,)
+        ).fetchone()
+        return dict(zip(LATENCY_FIELDS, row)) if row else None
+    
     def get_user_history(self, username):
         """Get test history for a specific user"""
-        self.cursor.execute('''
+        self.execute('''
         SELECT test_mode, difficulty, wpm, accuracy, errors, test_duration, timestamp 
         FROM test_results 
         WHERE username = ? 
@@ -158,9 +317,33 @@ class DatabaseManager:
         ''', (username,))
         return self.cursor.fetchall()
     
+    def get_history_page(self, username, limit=100, after=None):
+        """Get one page of a user's test history, newest first.
+        
+        after is the (timestamp, id) of the last row of the previous page;
+        rows start with the id so callers can build the next key.
+        """
+        if after is None:
+            self.execute('''
+            SELECT id, timestamp, test_mode, difficulty, wpm, accuracy, errors, test_duration 
+            FROM test_results 
+            WHERE username = ? 
+            ORDER BY timestamp DESC, id DESC 
+            LIMIT ?
+            ''', (username, limit))
+        else:
+            self.execute('''
+            SELECT id, timestamp, test_mode, difficulty, wpm, accuracy, errors, test_duration 
+            FROM test_results 
+            WHERE username = ? AND (timestamp, id) < (?, ?) 
+            ORDER BY timestamp DESC, id DESC 
+            LIMIT ?
+            ''', (username, after[0], after[1], limit))
+        return self.cursor.fetchall()
+    
     def get_user_progress(self, username):
         """Get WPM and accuracy progress over time for a specific user"""
-        self.cursor.execute('''
+        self.execute('''
         SELECT wpm, accuracy, timestamp 
         FROM test_results 
         WHERE username = ? 
@@ -168,30 +351,129 @@ class DatabaseManager:
         ''', (username,))
         return self.cursor.fetchall()
     
-    def get_leaderboard(self, limit=10):
-        """Get top scores from all users"""
-        self.cursor.execute('''
-        SELECT username, wpm, accuracy, test_mode, difficulty, timestamp 
-        FROM test_results 
-        ORDER BY wpm DESC 
+    def leaderboard_period(self, window, now=None):
+        """Period key of the current all/month/week/day leaderboard window"""
+        now = now or datetime.now()
+        if window == "month":
+            return now.strftime("%Y-%m")
+        if window == "week":
+            # ISO week, so the days around New Year stay in one week
+            year, week, weekday = now.isocalendar()
+            return f"{year}-W{week:02d}"
+        if window == "day":
+            return now.strftime("%Y-%m-%d")
+        return "all"
+    
+    def leaderboard_key(self, mode=None, value=None, difficulty=None, window="all"):
+        """Leaderboard table key (period type, period, mode, value, difficulty) of a filter"""
+        if mode:
+            return (window, self.leaderboard_period(window), mode, value or 0, difficulty or "all")
+        return (window, self.leaderboard_period(window), "all", 0, "all")
+    
+    def get_leaderboard(self, limit=10, mode=None, value=None, difficulty=None, window="all"):
+        """Get the best result of each user, optionally for one mode, difficulty and time window"""
+        key = self.leaderboard_key(mode, value, difficulty, window)
+        self.execute('''
+        SELECT l.username, l.wpm, l.accuracy, r.test_mode, r.difficulty, l.timestamp 
+        FROM leaderboard l 
+        JOIN test_results r ON r.id = l.test_id 
+        WHERE l.period_type = ? AND l.period = ? AND l.test_mode = ? AND l.test_value = ? AND l.difficulty = ? 
+        ORDER BY l.wpm DESC 
         LIMIT ?
-        ''', (limit,))
+        ''', key + (limit,))
         return self.cursor.fetchall()
     
-    def export_results(self, username):
-        """Export user results to CSV file"""
-        # Get user history
-        history = self.get_user_history(username)
+    def get_leaderboard_page(self, limit=100, after=None, mode=None, value=None, difficulty=None, window="all"):
+        """Get one page of a leaderboard, ordered by WPM and then username.
         
-        # Create CSV file
-        with open('typing_results.csv', 'w', newline='') as file:
-            writer = csv.writer(file)
-            # Write header
-            writer.writerow(['Test Mode', 'Difficulty', 'WPM', 'Accuracy (%)', 'Errors', 'Duration (s)', 'Timestamp'])
-            # Write data
-            for row in history:
-                writer.writerow(row)
+        after is the (wpm, username) of the last row of the previous page.
+        Pages are found by seeking idx_leaderboard_rank, so every page costs
+        the same however deep the user has scrolled.
+        """
+        key = self.leaderboard_key(mode, value, difficulty, window)
+        if after is None:
+            after = (float("inf"), "")
+        self.execute('''
+        SELECT l.username, l.wpm, l.accuracy, r.test_mode, r.difficulty, l.timestamp 
+        FROM leaderboard l 
+        JOIN test_results r ON r.id = l.test_id 
+        WHERE l.period_type = ? AND l.period = ? AND l.test_mode = ? AND l.test_value = ? AND l.difficulty = ? 
+          AND l.wpm <= ? AND (l.wpm < ? OR l.username > ?) 
+        ORDER BY l.wpm DESC, l.username ASC 
+        LIMIT ?
+        ''', key + (after[0], after[0], after[1], limit))
+        return self.cursor.fetchall()
+    
+    def get_keystrokes(self, test_id):
+        """Get the recorded key events of a test in the order they were typed"""
+        self.execute('''
+        SELECT seq, key, char, time_offset, position, correct 
+        FROM keystrokes 
+        WHERE test_id = ? 
+        ORDER BY seq
+        ''', (test_id,))
+        return self.cursor.fetchall()
+    
+    def count_results(self, username=None):
+        """Count the test results of a user, or of all users"""
+        if username is None:
+            return self.execute("SELECT COUNT(*) FROM test_results").fetchone()[0]
+        return self.execute("SELECT COUNT(*) FROM test_results WHERE username = ?", 
+                            (username,)).fetchone()[0]
+    
+    def iter_results(self, username=None, batch_size=1000):
+        """Yield test results in batches, newest first.
+
+        A user's rows have the history columns; with username=None every
+        user's rows are returned with the username in front.
+        """
+        # A dedicated cursor so other queries on this thread don't reset the iteration
+        cursor = self.conn.cursor()
+        try:
+            if username is None:
+                self._retry(cursor.execute, '''
+                SELECT username, test_mode, difficulty, wpm, accuracy, errors, test_duration, timestamp 
+                FROM test_results 
+                ORDER BY id DESC
+                ''')
+            else:
+                self._retry(cursor.execute, '''
+                SELECT test_mode, difficulty, wpm, accuracy, errors, test_duration, timestamp 
+                FROM test_results 
+                WHERE username = ? 
+                ORDER BY timestamp DESC
+                ''', (username,))
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            cursor.close()
+    
+    def export_results(self, username, path="typing_results.csv", fmt=None, progress_callback=None):
+        """Export results to a CSV, JSON Lines or gzip file, streaming rows from the database.
+
+        Pass username=None to export the results of all users.
+        """
+        return ResultExporter(self).export(path, username, fmt, progress_callback)
+    
+    def release_connection(self):
+        """Close the calling thread's connection, e.g. before a worker thread exits"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            return
+        with self._connections_lock:
+            if conn in self._connections:
+                self._connections.remove(conn)
+        conn.close()
+        self._local.conn = None
+        self._local.cursor = None
     
     def close(self):
-        """Close database connection"""
-        self.conn.close()
\ No newline at end of file
+        """Close the connections of all threads"""
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
\ No newline at end of file
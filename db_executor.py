@@ -0,0 +1,78 @@
+import queue
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+class DatabaseExecutor:
+    """Run database calls on worker threads and hand the results back to Tk.
+
+    Each worker uses its own thread-local connection. Callbacks never run
+    on a worker: finished calls are queued and drained on the Tk thread by
+    an after() timer that is only scheduled while calls are outstanding.
+    """
+
+    def __init__(self, db_manager, tk_root, max_workers=2, poll_interval=15):
+        self.db_manager = db_manager
+        self.tk_root = tk_root
+        self.poll_interval = poll_interval
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="db-worker")
+        self.finished = queue.SimpleQueue()
+        self.outstanding = 0
+        self.poll_scheduled = False
+        self.closed = False
+
+    def submit(self, func, *args, callback=None, error_callback=None, **kwargs):
+        """Run func(*args, **kwargs) on a worker and return its Future.
+
+        callback(result) or error_callback(exception) is then called on the
+        Tk thread. Errors without an error_callback are printed.
+        """
+        future = self.pool.submit(func, *args, **kwargs)
+        self.outstanding += 1
+        future.add_done_callback(lambda done: self.finished.put((done, callback, error_callback)))
+        self.schedule_poll()
+        return future
+
+    def schedule_poll(self):
+        """Check for finished calls on the next poll"""
+        if not self.poll_scheduled and not self.closed:
+            self.poll_scheduled = True
+            self.tk_root.after(self.poll_interval, self.poll)
+
+    def poll(self):
+        """Run the callbacks of finished calls on the Tk thread"""
+        self.poll_scheduled = False
+        while True:
+            try:
+                future, callback, error_callback = self.finished.get_nowait()
+            except queue.Empty:
+                break
+            self.outstanding -= 1
+            self.deliver(future, callback, error_callback)
+
+        if self.outstanding:
+            self.schedule_poll()
+
+    def deliver(self, future, callback, error_callback):
+        """Pass a finished call's result or error to its callback"""
+        error = future.exception()
+        try:
+            if error is None:
+                if callback:
+                    callback(future.result())
+            elif error_callback:
+                error_callback(error)
+            else:
+                print(f"Database error: {error}")
+        except Exception:
+            # Report like any other Tk callback instead of stopping the poll
+            self.tk_root.report_callback_exception(*sys.exc_info())
+
+    def shutdown(self):
+        """Wait for submitted calls to finish and run their callbacks (call on the Tk thread).
+
+        Callbacks such as flushing a saved test's keystrokes must not be
+        lost when the window is closed during a save.
+        """
+        self.closed = True
+        self.pool.shutdown(wait=True)
+        self.poll()
@@ -0,0 +1,135 @@
+from matplotlib.backend_bases import FigureCanvasBase
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.figure import Figure
+
+class PooledFigure:
+    """A Figure with one Axes whose artists are kept and updated between uses.
+
+    Artists are looked up by name: the first use creates them, later uses
+    move the existing ones with set_data instead of building new ones.
+    """
+
+    def __init__(self, kind, figsize, dpi):
+        self.kind = kind
+        self.figure = Figure(figsize=figsize, dpi=dpi)
+        self.ax = self.figure.add_subplot(111)
+        self.artists = {}
+        self.canvas = None
+
+    def hide_artists(self):
+        """Hide every named artist; the ones used again are shown by line() and text()"""
+        for artist in self.artists.values():
+            artist.set_visible(False)
+
+    def line(self, name, x, y, **style):
+        """Create or update a named line"""
+        line = self.artists.get(name)
+        if line is None:
+            line = self.ax.plot(x, y, **style)[0]
+            self.artists[name] = line
+        else:
+            line.set_data(x, y)
+            line.set(visible=True, **style)
+        return line
+
+    def text(self, name, x, y, text, **style):
+        """Create or update a named text"""
+        artist = self.artists.get(name)
+        if artist is None:
+            artist = self.ax.text(x, y, text, **style)
+            self.artists[name] = artist
+        else:
+            artist.set_position((x, y))
+            artist.set(text=text, visible=True, **style)
+        return artist
+
+    def rescale(self):
+        """Fit the axes to the visible artists"""
+        self.ax.relim(visible_only=True)
+        self.ax.autoscale_view()
+
+class FigurePool:
+    """Reuse matplotlib figures across charts and release their Tk canvases.
+
+    A figure shown in a canvas stays in use until the canvas widget is
+    destroyed; it is then reclaimed on the next acquire(). Windows set up
+    with manage_window() release their figures as soon as they close.
+    """
+
+    def __init__(self, max_idle=4):
+        self.max_idle = max_idle
+        self.idle = {}
+        self.in_use = []
+
+    def acquire(self, kind, figsize, dpi=100, setup=None):
+        """Get an idle figure of a kind, or a new one styled with setup(figure, ax)"""
+        self.reclaim()
+        idle = self.idle.get(kind)
+        if idle:
+            pooled = idle.pop()
+            pooled.hide_artists()
+        else:
+            pooled = PooledFigure(kind, figsize, dpi)
+            if setup:
+                setup(pooled.figure, pooled.ax)
+        self.in_use.append(pooled)
+        return pooled
+
+    def show(self, pooled, master, **pack_options):
+        """Draw a figure into a new canvas packed into master.
+
+        With master=None the figure is drawn offscreen on an Agg canvas and
+        goes straight back to the pool, e.g. for benchmarks without a display.
+        """
+        if master is None:
+            canvas = FigureCanvasAgg(pooled.figure)
+            canvas.draw()
+            self.release(pooled)
+            return canvas
+
+        canvas = FigureCanvasTkAgg(pooled.figure, master=master)
+        pooled.canvas = canvas
+        canvas.draw()
+        canvas.get_tk_widget().pack(**pack_options)
+        return canvas
+
+    def release(self, pooled):
+        """Destroy the figure's canvas and return the figure to the pool"""
+        canvas, pooled.canvas = pooled.canvas, None
+        if canvas is not None:
+            widget = canvas.get_tk_widget()
+            if widget.winfo_exists():
+                widget.destroy()
+        # Drop the figure's reference to the Tk canvas and its photo image
+        FigureCanvasBase(pooled.figure)
+
+        self.in_use.remove(pooled)
+        idle = self.idle.setdefault(pooled.kind, [])
+        if len(idle) < self.max_idle:
+            idle.append(pooled)
+
+    def reclaim(self):
+        """Release figures whose canvas widgets have been destroyed"""
+        for pooled in list(self.in_use):
+            if pooled.canvas is not None and not pooled.canvas.get_tk_widget().winfo_exists():
+                self.release(pooled)
+
+    def close_window(self, window):
+        """Release the figures shown in a Toplevel, then destroy it"""
+        self.reclaim()
+        for pooled in list(self.in_use):
+            if pooled.canvas is not None and pooled.canvas.get_tk_widget().winfo_toplevel() is window:
+                self.release(pooled)
+        window.destroy()
+
+    def manage_window(self, window):
+        """Release a Toplevel's figures when it is closed from the title bar.
+
+        Without this, Tk destroys the window but tkinter keeps its widgets,
+        and the canvases inside them, referenced from the parent.
+        """
+        window.protocol("WM_DELETE_WINDOW", lambda: self.close_window(window))
+
+# Shared by every StatsVisualizer
+figure_pool = FigurePool()
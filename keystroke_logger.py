@@ -0,0 +1,72 @@
+import queue
+import sqlite3
+import threading
+
+class KeystrokeLogger:
+    """Record raw keystroke events and store them from a background thread.
+
+    Events are appended to an in-memory buffer so recording costs no more
+    than a list append in the key handler. When a test is saved the buffer
+    is handed to a writer thread, which inserts it with executemany in a
+    single transaction.
+    """
+
+    def __init__(self, db_manager):
+        """Initialize the logger and start the writer thread"""
+        self.db_manager = db_manager
+        self.buffer = []
+        self.pending = queue.Queue()
+
+        self.writer_thread = threading.Thread(target=self._writer_loop,
+                                              name="keystroke-writer", daemon=True)
+        self.writer_thread.start()
+
+    def record(self, key, char, timestamp, position=None, correct=None):
+        """Buffer a single key event (timestamp from time.perf_counter)"""
+        self.buffer.append((key, char, timestamp, position, correct))
+
+    def discard(self):
+        """Drop the events buffered for the current test"""
+        self.buffer = []
+
+    def take(self):
+        """Remove and return the events buffered for the current test"""
+        events, self.buffer = self.buffer, []
+        return events
+
+    def flush(self, test_id, events=None):
+        """Queue the events of a finished test for writing, by default the buffered ones"""
+        if events is None:
+            events = self.take()
+        if events:
+            self.pending.put((test_id, events))
+
+    def close(self, timeout=5.0):
+        """Write any queued events and stop the writer thread"""
+        self.pending.put(None)
+        self.writer_thread.join(timeout)
+
+    def _writer_loop(self):
+        """Writer thread: insert each test's events in one transaction"""
+        while True:
+            item = self.pending.get()
+            if item is None:
+                break
+            test_id, events = item
+            try:
+                with self.db_manager.transaction() as cursor:
+                    cursor.executemany(
+                        """INSERT INTO keystrokes
+                           (test_id, seq, key, char, time_offset, position, correct)
+                           VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                        self._rows(test_id, events)
+                    )
+            except sqlite3.Error as e:
+                print(f"Error saving keystrokes for test {test_id}: {e}")
+
+    def _rows(self, test_id, events):
+        """Convert buffered events into rows, timed relative to the first key"""
+        start = events[0][2]
+        for seq, (key, char, timestamp, position, correct) in enumerate(events):
+            yield (test_id, seq, key, char, timestamp - start, position,
+                   None if correct is None else int(correct))
@@ -0,0 +1,167 @@
+import math
+import time
+import tkinter as tk
+
+class LatencyHistogram:
+    """Log-bucketed histogram of durations in milliseconds.
+
+    Memory is fixed however many samples are added; percentiles are
+    reported as bucket upper bounds, within about 5% of the true value.
+    """
+
+    def __init__(self, min_ms=0.05, max_ms=60000.0, growth=1.05):
+        self.min_ms = min_ms
+        self.growth = growth
+        self.log_growth = math.log(growth)
+        self.buckets = [0] * (int(math.log(max_ms / min_ms) / self.log_growth) + 2)
+        self.count = 0
+        self.max_ms = 0.0
+
+    def add(self, ms):
+        """Add one duration"""
+        if ms <= self.min_ms:
+            index = 0
+        else:
+            index = min(int(math.log(ms / self.min_ms) / self.log_growth) + 1, len(self.buckets) - 1)
+        self.buckets[index] += 1
+        self.count += 1
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def percentile(self, percent):
+        """Upper bound of the bucket holding the given percentile, 0 when empty"""
+        if not self.count:
+            return 0.0
+        rank = max(math.ceil(percent / 100.0 * self.count), 1)
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank:
+                return min(self.min_ms * self.growth ** index, self.max_ms)
+        return self.max_ms
+
+class LatencyMonitor:
+    """Measure Tk main-loop lag and key-to-paint latency during a test.
+
+    A probe scheduled with after() every probe_interval records how late
+    it runs; lag above stall_threshold counts as a stall.
+
+    Key-to-paint latency is the interval from the <Key> (KeyPress) event
+    to the first idle callback after the display was retagged for it.
+    The retag itself runs from an idle callback scheduled on KeyPress, and
+    the callback marking keys painted is queued behind the Text widget's
+    own redraw, which Tk schedules as an idle handler when tags change.
+    How long a key is held down is therefore not included.
+    """
+
+    def __init__(self, widget, probe_interval=0.05, stall_threshold=0.1):
+        self.widget = widget
+        self.probe_interval = probe_interval
+        self.stall_threshold = stall_threshold
+
+        self.input_latency = LatencyHistogram()
+        self.loop_lag = LatencyHistogram()
+        self.stalls = 0
+
+        self.pending_keys = []
+        self.paint_scheduled = False
+        self.next_time = None
+        self.job = None
+
+    def start(self):
+        """Start probing the main loop"""
+        self.next_time = time.perf_counter() + self.probe_interval
+        self.job = self.widget.after(int(self.probe_interval * 1000), self.probe)
+
+    def stop(self):
+        """Stop the probe"""
+        if self.job is not None:
+            self.widget.after_cancel(self.job)
+            self.job = None
+
+    def probe(self):
+        """Record how late this probe ran and schedule the next one"""
+        self.job = None
+        if not self.widget.winfo_exists():
+            return
+        now = time.perf_counter()
+        lag = max(now - self.next_time, 0.0)
+        self.loop_lag.add(lag * 1000.0)
+        if lag > self.stall_threshold:
+            self.stalls += 1
+
+        self.next_time = now + self.probe_interval
+        self.job = self.widget.after(int(self.probe_interval * 1000), self.probe)
+
+    def key_pressed(self, timestamp):
+        """Note a key press (time.perf_counter) whose effect will be painted"""
+        self.pending_keys.append(timestamp)
+
+    def retagged(self):
+        """The display was retagged; time the pending keys once it is painted"""
+        if self.pending_keys and not self.paint_scheduled:
+            self.paint_scheduled = True
+            self.widget.after_idle(self.painted)
+
+    def painted(self):
+        """Idle callback after the redraw: record input-to-paint latency"""
+        now = time.perf_counter()
+        for timestamp in self.pending_keys:
+            self.input_latency.add((now - timestamp) * 1000.0)
+        self.pending_keys = []
+        self.paint_scheduled = False
+
+    def summary(self):
+        """Percentiles in milliseconds and stall count, as saved with results"""
+        input_latency = self.input_latency
+        loop_lag = self.loop_lag
+        return {
+            "keys": input_latency.count,
+            "input_p50_ms": input_latency.percentile(50),
+            "input_p95_ms": input_latency.percentile(95),
+            "input_p99_ms": input_latency.percentile(99),
+            "input_max_ms": input_latency.max_ms,
+            "lag_p50_ms": loop_lag.percentile(50),
+            "lag_p95_ms": loop_lag.percentile(95),
+            "lag_p99_ms": loop_lag.percentile(99),
+            "lag_max_ms": loop_lag.max_ms,
+            "stalls": self.stalls
+        }
+
+class LatencyOverlay:
+    """Developer overlay showing a LatencyMonitor's numbers, refreshed periodically"""
+
+    def __init__(self, parent, monitor, interval=500):
+        self.monitor = monitor
+        self.interval = interval
+        self.label = tk.Label(parent, text="", font=("Courier", 9), bg="#323437", fg="#646669",
+                              justify=tk.LEFT)
+        self.job = None
+
+    def pack(self, **pack_options):
+        """Pack the overlay's label"""
+        self.label.pack(**pack_options)
+
+    def start(self):
+        """Start refreshing"""
+        self.refresh()
+
+    def stop(self):
+        """Stop refreshing"""
+        if self.job is not None:
+            self.label.after_cancel(self.job)
+            self.job = None
+
+    def refresh(self):
+        """Show the current percentiles"""
+        self.job = None
+        if not self.label.winfo_exists():
+            return
+        stats = self.monitor.summary()
+        self.label.config(text=(
+            f"key->paint p50 {stats['input_p50_ms']:.1f}  p95 {stats['input_p95_ms']:.1f}  "
+            f"p99 {stats['input_p99_ms']:.1f} ms\n"
+            f"loop lag  p50 {stats['lag_p50_ms']:.1f}  p95 {stats['lag_p95_ms']:.1f}  "
+            f"p99 {stats['lag_p99_ms']:.1f} ms  stalls {stats['stalls']}"
+        ))
+        self.job = self.label.after(self.interval, self.refresh)
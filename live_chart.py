@@ -0,0 +1,122 @@
+import time
+import tkinter as tk
+from collections import deque
+
+class LiveChart:
+    """Live WPM and accuracy sparkline drawn on a plain Tk Canvas.
+
+    Samples are taken at a fixed rate, independent of key presses. Each
+    frame adds one line segment per series instead of redrawing the chart,
+    and old segments scroll off the left edge. A frame is skipped when the
+    timer fires late or the previous frame went over the frame budget, so
+    drawing never holds up key handling; the next frame simply draws a
+    longer segment.
+    """
+
+    SERIES_COLORS = {
+        "wpm": "#e2b714",
+        "accuracy": "#a3be8c"
+    }
+
+    def __init__(self, parent, sample, width=600, height=60, interval=0.25, budget=0.004, step=4):
+        """sample(now) returns (wpm, accuracy) for a time.perf_counter() timestamp"""
+        self.sample = sample
+        self.width = width
+        self.height = height
+        self.interval = interval
+        self.budget = budget
+        self.step = step
+        self.pad = 4
+
+        self.canvas = tk.Canvas(parent, width=width, height=height, bg="#2c2e31",
+                                highlightthickness=0)
+
+        # Top of each series' scale; WPM grows when a sample goes above it
+        self.scales = {"wpm": 60.0, "accuracy": 100.0}
+        # Last drawn point of each series as (x in chart units, value)
+        self.last_points = {}
+        # Canvas item ids of drawn segments with their right edge, oldest first
+        self.segments = deque()
+        self.offset = 0
+
+        self.start_time = None
+        self.next_time = None
+        self.last_cost = 0.0
+        self.skipped_frames = 0
+        self.job = None
+
+    def pack(self, **pack_options):
+        """Pack the chart's canvas"""
+        self.canvas.pack(**pack_options)
+
+    def start(self):
+        """Start sampling and drawing"""
+        self.start_time = time.perf_counter()
+        self.next_time = self.start_time + self.interval
+        self.job = self.canvas.after(int(self.interval * 1000), self.tick)
+
+    def stop(self):
+        """Stop the frame timer"""
+        if self.job is not None:
+            self.canvas.after_cancel(self.job)
+            self.job = None
+
+    def tick(self):
+        """Frame timer: schedule the next frame, then draw this one unless over budget"""
+        self.job = None
+        if not self.canvas.winfo_exists():
+            return
+
+        now = time.perf_counter()
+        lag = now - self.next_time
+        # Keep a fixed rate without trying to catch up on missed frames
+        self.next_time += self.interval * (1 + int(max(lag, 0) / self.interval))
+        self.job = self.canvas.after(max(int((self.next_time - now) * 1000), 1), self.tick)
+
+        if lag > self.interval / 2 or self.last_cost > self.budget:
+            self.skipped_frames += 1
+            self.last_cost = 0.0
+            return
+
+        x = round((now - self.start_time) / self.interval) * self.step
+        for name, value in zip(("wpm", "accuracy"), self.sample(now)):
+            self.add_point(name, x, value)
+        self.scroll(x)
+        self.last_cost = time.perf_counter() - now
+
+    def y(self, name, value):
+        """Canvas y coordinate of a value"""
+        usable = self.height - 2 * self.pad
+        return self.height - self.pad - min(max(value, 0.0) / self.scales[name], 1.0) * usable
+
+    def add_point(self, name, x, value):
+        """Draw the segment from the series' previous point to a new one"""
+        if name == "wpm" and value > self.scales["wpm"]:
+            # Squash the drawn segments to the new scale in one canvas call
+            new_scale = value * 1.25
+            baseline = self.height - self.pad
+            self.canvas.scale("wpm", 0, baseline, 1, self.scales["wpm"] / new_scale)
+            self.scales["wpm"] = new_scale
+
+        previous = self.last_points.get(name)
+        self.last_points[name] = (x, value)
+        if previous is None:
+            return
+
+        item = self.canvas.create_line(
+            previous[0] - self.offset, self.y(name, previous[1]),
+            x - self.offset, self.y(name, value),
+            fill=self.SERIES_COLORS[name], width=2, tags=(name,)
+        )
+        self.segments.append((x, item))
+
+    def scroll(self, x):
+        """Shift the chart left by a quarter width once the newest point reaches the edge"""
+        if x - self.offset <= self.width:
+            return
+        shift = x - self.offset - self.width + self.width // 4
+        self.canvas.move("all", -shift, 0)
+        self.offset += shift
+
+        while self.segments and self.segments[0][0] < self.offset:
+            self.canvas.delete(self.segments.popleft()[1])
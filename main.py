@@ -1,24 +1,34 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 import sqlite3
 import time
 import random
 import os
+import threading
 from datetime import datetime
 import sys
 
 # Import our modules
 from database_manager import DatabaseManager
+from db_executor import DatabaseExecutor
 from user_auth import UserAuth
 from typing_test import TypingTest
-from stats_visualizer import StatsVisualizer
 from settings_manager import SettingsManager
 from sound_manager import SoundManager
+from keystroke_logger import KeystrokeLogger
+from result_exporter import ResultExporter
+import tracing
+
+# Delay after the first paint before heavy modules are preloaded (ms)
+WARM_UP_DELAY = 300
 
 class TypeMaster(tk.Tk):
     def __init__(self):
         super().__init__()
         
+        # Wrap hot paths with timing spans when TYPEMASTER_TRACE is set
+        tracing.install()
+        
         # Set up the main window
         self.title("Type Master")
         self.geometry("1000x700")
@@ -28,15 +38,31 @@ class TypeMaster(tk.Tk):
         self.db_manager = DatabaseManager("typing_data.db")
         self.db_manager.setup_database()
         
+        # Run later database calls off the Tk thread
+        self.db_executor = DatabaseExecutor(self.db_manager, self)
+        
+        # Initialize keystroke recording
+        self.keystroke_logger = KeystrokeLogger(self.db_manager)
+        
         # Initialize user authentication
-        self.user_auth = UserAuth(self, self.db_manager)
+        self.user_auth = UserAuth(self, self.db_manager, self.db_executor)
         self.current_user = None
+        self.current_user_is_admin = False
         
         # Initialize settings
         self.settings_manager = SettingsManager(self)
         
         # Initialize sound manager
-        self.sound_manager = SoundManager()
+        self.sound_manager = SoundManager(buffer_size=self.settings_manager.settings["sound_buffer"])
+        
+        # Push results to a shared sync server if one is configured
+        self.sync_client = None
+        sync_url = os.environ.get("TYPEMASTER_SYNC_URL")
+        if sync_url:
+            # Imported here, urllib is slow to load and most installs don't sync
+            from sync_client import SyncClient
+            self.sync_client = SyncClient(self.db_manager, sync_url)
+            self.sync_client.start()
         
         # Create the main frame
         self.main_frame = tk.Frame(self, bg="#323437")
@@ -45,8 +71,34 @@ class TypeMaster(tk.Tk):
         # Create menu bar
         self.create_menu_bar()
         
+        # Flush pending writes when the window is closed
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        
         # Show login/registration screen or start directly
         self.show_welcome_screen()
+        
+        # Load charts and sound in the background once the window is up
+        self.after(WARM_UP_DELAY, self.start_warm_up)
+    
+    def start_warm_up(self):
+        """Preload matplotlib and open the audio mixer off the UI thread"""
+        threading.Thread(target=self.warm_up, name="warm-up", daemon=True).start()
+    
+    def warm_up(self):
+        """Import the chart module, initialize sound and calibrate password hashing ahead of first use"""
+        try:
+            import stats_visualizer
+        except ImportError as e:
+            print(f"Charts unavailable: {e}")
+        self.sound_manager.init_mixer()
+        self.user_auth.password_hasher.calibrate()
+    
+    def create_visualizer(self, parent_frame):
+        """Create a StatsVisualizer, importing matplotlib on first use"""
+        from stats_visualizer import StatsVisualizer
+        # Trace the chart module too, now that it is loaded
+        tracing.install()
+        return StatsVisualizer(parent_frame, self.db_manager, self.db_executor)
     
     def create_menu_bar(self):
         menu_bar = tk.Menu(self)
@@ -54,9 +106,11 @@ class TypeMaster(tk.Tk):
         # File menu
         file_menu = tk.Menu(menu_bar, tearoff=0)
         file_menu.add_command(label="Export Results", command=self.export_results)
+        # "Export All Users" is inserted here while an admin is logged in
         file_menu.add_separator()
-        file_menu.add_command(label="Exit", command=self.quit)
+        file_menu.add_command(label="Exit", command=self.on_close)
         menu_bar.add_cascade(label="File", menu=file_menu)
+        self.file_menu = file_menu
         
         # Test modes menu
         test_menu = tk.Menu(menu_bar, tearoff=0)
@@ -71,6 +125,7 @@ class TypeMaster(tk.Tk):
         test_menu.add_command(label="Words: 100", command=lambda: self.start_test("words", 100))
         test_menu.add_separator()
         test_menu.add_command(label="Paragraph", command=lambda: self.start_test("paragraph"))
+        test_menu.add_command(label="Endless", command=lambda: self.start_test("endless"))
         test_menu.add_command(label="Custom Text", command=self.show_custom_text_dialog)
         menu_bar.add_cascade(label="Test Mode", menu=test_menu)
         
@@ -83,6 +138,7 @@ class TypeMaster(tk.Tk):
         # Stats menu
         stats_menu = tk.Menu(menu_bar, tearoff=0)
         stats_menu.add_command(label="View Progress", command=self.show_progress)
+        stats_menu.add_command(label="Test History", command=self.show_history)
         stats_menu.add_command(label="Leaderboard", command=self.show_leaderboard)
         menu_bar.add_cascade(label="Statistics", menu=stats_menu)
         
@@ -161,8 +217,21 @@ class TypeMaster(tk.Tk):
         # If user is logged in, save results to database
         username = self.current_user if self.current_user else "guest"
         
-        # Save the results to the database
-        test_id = self.db_manager.save_test_results(
+        # Keep this test's keystrokes, a new test may start before the save finishes
+        events = self.keystroke_logger.take()
+        
+        def on_saved(test_id):
+            # Write the recorded keystrokes in the background
+            self.keystroke_logger.flush(test_id, events)
+            if self.sync_client:
+                self.sync_client.notify()
+        
+        def on_error(error):
+            messagebox.showerror("Database Error", f"Error saving results: {error}")
+        
+        # Save the results to the database on a worker
+        self.db_executor.submit(
+            self.db_manager.save_test_results,
             username,
             results["mode"],
             results["difficulty"],
@@ -171,13 +240,17 @@ class TypeMaster(tk.Tk):
             results["errors"],
             results["correct_chars"],
             results["total_chars"],
-            results["test_duration"]
+            results["test_duration"],
+            results["value"],
+            latency=results.get("latency"),
+            callback=on_saved,
+            error_callback=on_error
         )
         
         # Show results
-        self.show_results(results, test_id)
+        self.show_results(results)
     
-    def show_results(self, results, test_id):
+    def show_results(self, results):
         # Clear the main frame
         for widget in self.main_frame.winfo_children():
             widget.destroy()
@@ -211,7 +284,7 @@ class TypeMaster(tk.Tk):
         duration_label.grid(row=3, column=0, pady=5, sticky='w')
         
         # Create a visualizer for the graph
-        visualizer = StatsVisualizer(results_frame, self.db_manager)
+        visualizer = self.create_visualizer(results_frame)
         
         # Create graph of WPM over time
         visualizer.create_wpm_graph(results["wpm_over_time"], results["wpm"])
@@ -287,20 +360,107 @@ class TypeMaster(tk.Tk):
             messagebox.showinfo("Login Required", "Please log in to view your progress.")
             return
         
-        visualizer = StatsVisualizer(None, self.db_manager)
+        visualizer = self.create_visualizer(None)
         visualizer.show_progress_window(self.current_user)
     
+    def show_history(self):
+        if not self.current_user:
+            messagebox.showinfo("Login Required", "Please log in to view your test history.")
+            return
+        
+        visualizer = self.create_visualizer(None)
+        visualizer.show_history(self.current_user)
+    
     def show_leaderboard(self):
-        visualizer = StatsVisualizer(None, self.db_manager)
+        visualizer = self.create_visualizer(None)
         visualizer.show_leaderboard()
     
-    def export_results(self):
-        if not self.current_user:
+    def set_current_user(self, username, is_admin=False):
+        """Log a user in (or out with None) and show the admin menu entries they may use"""
+        self.current_user = username
+        if is_admin != self.current_user_is_admin:
+            if is_admin:
+                self.file_menu.insert_command(1, label="Export All Users",
+                                              command=lambda: self.export_results(all_users=True))
+            else:
+                self.file_menu.delete(1)
+        self.current_user_is_admin = is_admin
+    
+    def export_results(self, all_users=False):
+        if all_users and not self.current_user_is_admin:
+            messagebox.showerror("Not Allowed", "Only admins can export the results of all users.")
+            return
+        if not all_users and not self.current_user:
             messagebox.showinfo("Login Required", "Please log in to export your results.")
             return
         
-        self.db_manager.export_results(self.current_user)
-        messagebox.showinfo("Export", "Results exported successfully to 'typing_results.csv'")
+        path = filedialog.asksaveasfilename(
+            parent=self,
+            title="Export Results",
+            initialfile="typing_results.csv",
+            defaultextension=".csv",
+            filetypes=[("CSV", "*.csv"), ("JSON Lines", "*.jsonl"),
+                       ("Compressed CSV", "*.csv.gz"), ("Compressed JSON Lines", "*.jsonl.gz")]
+        )
+        if not path:
+            return
+        
+        self.show_export_progress(path, None if all_users else self.current_user)
+    
+    def show_export_progress(self, path, username):
+        """Run an export in the background and show its progress"""
+        progress_window = tk.Toplevel(self)
+        progress_window.title("Exporting")
+        progress_window.geometry("400x120")
+        progress_window.configure(bg="#323437")
+        progress_window.transient(self)
+        
+        status_label = tk.Label(progress_window, text="Exporting results...", 
+                              font=("Courier", 12), bg="#323437", fg="#d1d0c5")
+        status_label.pack(pady=15)
+        
+        progress_bar = ttk.Progressbar(progress_window, length=340, mode="determinate")
+        progress_bar.pack(pady=5)
+        
+        # Written by the export thread, read by the Tk loop
+        state = {"done": 0, "total": 0, "finished": None}
+        
+        def on_progress(done, total):
+            state["done"], state["total"] = done, total
+        
+        def on_done(written, error):
+            state["finished"] = (written, error)
+        
+        def poll():
+            if state["total"]:
+                progress_bar["value"] = 100.0 * state["done"] / state["total"]
+                status_label.config(text=f"Exported {state['done']} of {state['total']} results...")
+            if state["finished"] is None:
+                self.after(100, poll)
+                return
+            
+            progress_window.destroy()
+            written, error = state["finished"]
+            if error:
+                messagebox.showerror("Export", f"Error exporting results: {error}")
+            else:
+                messagebox.showinfo("Export", f"Exported {written} results to '{path}'")
+        
+        ResultExporter(self.db_manager).export_async(path, username, 
+                                                     progress_callback=on_progress, done_callback=on_done)
+        poll()
+    
+    def on_close(self):
+        """Finish background writes and close the application"""
+        # Runs the callbacks of saves still in flight, which queue their keystrokes and notify sync
+        self.db_executor.shutdown()
+        if self.sync_client:
+            self.sync_client.stop()
+        self.keystroke_logger.close()
+        self.db_manager.close()
+        if tracing.tracer.enabled:
+            print(f"Trace written to {tracing.tracer.export()}")
+        self.destroy()
     
     def show_help(self):
         help_text = """
@@ -313,6 +473,7 @@ class TypeMaster(tk.Tk):
         
         Keyboard shortcuts:
         - Esc: Cancel current test and Quit application
+        - Esc (endless mode): Finish the test and save the results
         """
         
         messagebox.showinfo("Help", help_text)
@@ -0,0 +1,419 @@
+from corpus import normalize_text, content_hash
+
+class Backfill:
+    """A data migration applied to a table in batches of rows.
+
+    apply_batch(cursor, after_id, last_id) must process the rows with
+    after_id < id <= last_id. Each batch runs in its own short transaction
+    and progress is recorded, so large tables never hold the write lock
+    for long and an interrupted upgrade resumes where it stopped.
+
+    The batch and its progress commit together, and the batch is claimed
+    under the same lock, so each batch is applied exactly once. Additive
+    batches such as backfill_user_stats rely on this.
+    """
+
+    def __init__(self, table, apply_batch, id_column="id"):
+        self.table = table
+        self.apply_batch = apply_batch
+        self.id_column = id_column
+
+class Migration:
+    """One schema version: statements run in a single transaction, then backfills"""
+
+    def __init__(self, version, description, statements=(), backfills=()):
+        self.version = version
+        self.description = description
+        self.statements = statements
+        self.backfills = backfills
+
+def seed_corpus(db_manager, cursor):
+    """Insert the default word lists and paragraphs into an empty database"""
+    if cursor.execute("SELECT COUNT(*) FROM word_lists").fetchone()[0] == 0:
+        db_manager.initialize_word_lists(cursor)
+    if cursor.execute("SELECT COUNT(*) FROM paragraphs").fetchone()[0] == 0:
+        db_manager.initialize_paragraphs(cursor)
+
+# Upsert every result in an id range into the leaderboard: one row per time
+# window and per scope (all modes, one mode, one mode and difficulty)
+LEADERBOARD_UPSERT = '''
+INSERT INTO leaderboard
+(period_type, period, test_mode, test_value, difficulty, username, wpm, accuracy, test_id, timestamp)
+SELECT period_type, period, test_mode, test_value, difficulty, username,
+       MAX(wpm), accuracy, test_id, timestamp
+FROM (
+    SELECT w.period_type,
+           CASE w.period_type
+               WHEN 'all' THEN 'all'
+               WHEN 'month' THEN strftime('%Y-%m', r.timestamp)
+               -- ISO year and week, taken from the Thursday of the result's week
+               WHEN 'week' THEN printf('%s-W%02d',
+                                       strftime('%Y', date(r.timestamp, '-3 days', 'weekday 4')),
+                                       (strftime('%j', date(r.timestamp, '-3 days', 'weekday 4')) - 1) / 7 + 1)
+               ELSE date(r.timestamp)
+           END AS period,
+           CASE WHEN s.scope = 'all' THEN 'all' ELSE r.test_mode END AS test_mode,
+           CASE WHEN s.scope = 'all' THEN 0 ELSE COALESCE(r.test_value, 0) END AS test_value,
+           CASE WHEN s.scope = 'difficulty' THEN r.difficulty ELSE 'all' END AS difficulty,
+           r.username, r.wpm, r.accuracy, r.id AS test_id, r.timestamp
+    FROM test_results r
+    CROSS JOIN (SELECT 'all' AS period_type UNION ALL SELECT 'month'
+                UNION ALL SELECT 'week' UNION ALL SELECT 'day') w
+    CROSS JOIN (SELECT 'all' AS scope UNION ALL SELECT 'mode'
+                UNION ALL SELECT 'difficulty') s
+    WHERE r.id > ? AND r.id <= ?
+)
+-- Only the best result of each user per key within the batch is upserted
+GROUP BY period_type, period, test_mode, test_value, difficulty, username
+ON CONFLICT (period_type, period, test_mode, test_value, difficulty, username) DO UPDATE SET
+    wpm = excluded.wpm,
+    accuracy = excluded.accuracy,
+    test_id = excluded.test_id,
+    timestamp = excluded.timestamp
+WHERE excluded.wpm > leaderboard.wpm
+'''
+
+# Add every result in an id range to the running per-user, per-mode aggregates
+USER_STATS_UPSERT = '''
+INSERT INTO user_stats (username, test_mode, tests, sum_wpm, sum_wpm_sq, sum_accuracy, best_wpm)
+SELECT username, COALESCE(test_mode, ''), COUNT(*), SUM(COALESCE(wpm, 0)),
+       SUM(COALESCE(wpm, 0) * COALESCE(wpm, 0)), SUM(COALESCE(accuracy, 0)), MAX(COALESCE(wpm, 0))
+FROM test_results
+WHERE id > ? AND id <= ? AND username IS NOT NULL
+GROUP BY username, COALESCE(test_mode, '')
+ON CONFLICT (username, test_mode) DO UPDATE SET
+    tests = tests + excluded.tests,
+    sum_wpm = sum_wpm + excluded.sum_wpm,
+    sum_wpm_sq = sum_wpm_sq + excluded.sum_wpm_sq,
+    sum_accuracy = sum_accuracy + excluded.sum_accuracy,
+    best_wpm = MAX(best_wpm, excluded.best_wpm)
+'''
+
+def backfill_leaderboard(cursor, after_id, last_id):
+    """Add existing results to the leaderboard"""
+    cursor.execute(LEADERBOARD_UPSERT, (after_id, last_id))
+
+def backfill_user_stats(cursor, after_id, last_id):
+    """Add existing results to the per-user aggregates (not idempotent, see Backfill)"""
+    cursor.execute(USER_STATS_UPSERT, (after_id, last_id))
+
+def backfill_content_hash(cursor, after_id, last_id):
+    """Hash existing paragraphs; duplicates keep a NULL hash"""
+    rows = cursor.execute(
+        "SELECT id, content FROM paragraphs WHERE id > ? AND id <= ?", (after_id, last_id)
+    ).fetchall()
+    cursor.executemany(
+        "UPDATE OR IGNORE paragraphs SET content_hash = ? WHERE id = ?",
+        [(content_hash(normalize_text(content or "")), paragraph_id) for paragraph_id, content in rows]
+    )
+
+def backfill_result_uid(cursor, after_id, last_id):
+    """Give existing results a random uid and queue them for syncing"""
+    cursor.execute(
+        "UPDATE test_results SET result_uid = lower(hex(randomblob(16))) WHERE id > ? AND id <= ? AND result_uid IS NULL",
+        (after_id, last_id)
+    )
+    cursor.execute(
+        "INSERT OR IGNORE INTO sync_outbox (test_id) SELECT id FROM test_results WHERE id > ? AND id <= ?",
+        (after_id, last_id)
+    )
+
+MIGRATIONS = [
+    Migration(1, "Base tables", [
+        '''
+        CREATE TABLE IF NOT EXISTS users (
+            username TEXT PRIMARY KEY,
+            password TEXT NOT NULL,
+            email TEXT,
+            date_joined TEXT DEFAULT CURRENT_TIMESTAMP,
+            tests_completed INTEGER DEFAULT 0,
+            avg_wpm REAL DEFAULT 0,
+            avg_accuracy REAL DEFAULT 0
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS test_results (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT,
+            test_mode TEXT,
+            difficulty TEXT,
+            wpm REAL,
+            accuracy REAL,
+            errors INTEGER,
+            correct_chars INTEGER,
+            total_chars INTEGER,
+            test_duration REAL,
+            timestamp TEXT DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (username) REFERENCES users (username)
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS word_lists (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            difficulty TEXT,
+            words TEXT
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS paragraphs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            difficulty TEXT,
+            content TEXT
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS keystrokes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            test_id INTEGER,
+            seq INTEGER,
+            key TEXT,
+            char TEXT,
+            time_offset REAL,
+            position INTEGER,
+            correct INTEGER,
+            FOREIGN KEY (test_id) REFERENCES test_results (id)
+        )
+        ''',
+        seed_corpus,
+    ]),
+    Migration(2, "Indexes for history, progress and leaderboard queries", [
+        # History and progress: one user's tests in time order, covering the progress columns
+        "CREATE INDEX IF NOT EXISTS idx_test_results_user_time ON test_results (username, timestamp, wpm, accuracy)",
+        # Leaderboards filtered by mode and difficulty, and the global one
+        "CREATE INDEX IF NOT EXISTS idx_test_results_mode_wpm ON test_results (test_mode, difficulty, wpm DESC)",
+        "CREATE INDEX IF NOT EXISTS idx_test_results_wpm ON test_results (wpm DESC)",
+        "CREATE INDEX IF NOT EXISTS idx_keystrokes_test ON keystrokes (test_id, seq)",
+        "CREATE INDEX IF NOT EXISTS idx_word_lists_difficulty ON word_lists (difficulty, id)",
+        "CREATE INDEX IF NOT EXISTS idx_paragraphs_difficulty ON paragraphs (difficulty, id)",
+    ]),
+    Migration(3, "Materialized best-per-user leaderboards", [
+        # Time and word tests are ranked per duration / word count
+        "ALTER TABLE test_results ADD COLUMN test_value INTEGER",
+        '''
+        CREATE TABLE IF NOT EXISTS leaderboard (
+            period_type TEXT,
+            period TEXT,
+            test_mode TEXT,
+            test_value INTEGER,
+            difficulty TEXT,
+            username TEXT,
+            wpm REAL,
+            accuracy REAL,
+            test_id INTEGER,
+            timestamp TEXT,
+            PRIMARY KEY (period_type, period, test_mode, test_value, difficulty, username)
+        ) WITHOUT ROWID
+        ''',
+        "CREATE INDEX IF NOT EXISTS idx_leaderboard_rank ON leaderboard (period_type, period, test_mode, test_value, difficulty, wpm DESC)",
+    ], [
+        Backfill("test_results", backfill_leaderboard),
+    ]),
+    Migration(4, "Corpus change tracking for in-memory caches", [
+        '''
+        CREATE TABLE IF NOT EXISTS corpus_version (
+            name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        )
+        ''',
+        "INSERT OR IGNORE INTO corpus_version (name, version) VALUES ('word_lists', 0), ('paragraphs', 0)",
+    ] + [
+        f'''
+        CREATE TRIGGER IF NOT EXISTS {table}_{event.lower()}_version AFTER {event} ON {table}
+        BEGIN
+            UPDATE corpus_version SET version = version + 1 WHERE name = '{table}';
+        END
+        '''
+        for table in ("word_lists", "paragraphs")
+        for event in ("INSERT", "UPDATE", "DELETE")
+    ]),
+    Migration(5, "Paragraph content hashes for deduplicated imports", [
+        "ALTER TABLE paragraphs ADD COLUMN content_hash TEXT",
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_paragraphs_hash ON paragraphs (content_hash) WHERE content_hash IS NOT NULL",
+    ], [
+        Backfill("paragraphs", backfill_content_hash),
+    ]),
+    Migration(6, "Running per-user aggregates by test mode", [
+        '''
+        CREATE TABLE IF NOT EXISTS user_stats (
+            username TEXT,
+            test_mode TEXT,
+            tests INTEGER NOT NULL DEFAULT 0,
+            sum_wpm REAL NOT NULL DEFAULT 0,
+            sum_wpm_sq REAL NOT NULL DEFAULT 0,
+            sum_accuracy REAL NOT NULL DEFAULT 0,
+            best_wpm REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (username, test_mode)
+        ) WITHOUT ROWID
+        ''',
+    ], [
+        Backfill("test_results", backfill_user_stats),
+    ]),
+    Migration(7, "Result uids and outbox for multi-install sync", [
+        # Idempotency key, shared by every copy of a result
+        "ALTER TABLE test_results ADD COLUMN result_uid TEXT",
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_test_results_uid ON test_results (result_uid) WHERE result_uid IS NOT NULL",
+        # Results not yet acknowledged by the sync server
+        "CREATE TABLE IF NOT EXISTS sync_outbox (test_id INTEGER PRIMARY KEY)",
+    ], [
+        Backfill("test_results", backfill_result_uid),
+    ]),
+    Migration(8, "Per-test input latency", [
+        '''
+        CREATE TABLE IF NOT EXISTS test_latency (
+            test_id INTEGER PRIMARY KEY,
+            keys INTEGER,
+            input_p50_ms REAL,
+            input_p95_ms REAL,
+            input_p99_ms REAL,
+            input_max_ms REAL,
+            lag_p50_ms REAL,
+            lag_p95_ms REAL,
+            lag_p99_ms REAL,
+            lag_max_ms REAL,
+            stalls INTEGER,
+            FOREIGN KEY (test_id) REFERENCES test_results (id)
+        )
+        ''',
+    ]),
+    Migration(9, "ISO week leaderboard periods", [
+        # Weekly rows were keyed by %W weeks, which split at New Year
+        "DELETE FROM leaderboard WHERE period_type = 'week'",
+    ], [
+        Backfill("test_results", backfill_leaderboard),
+    ]),
+    Migration(10, "Admin accounts", [
+        # Granted with admin_tool.py; admins may export every user's results
+        "ALTER TABLE users ADD COLUMN is_admin INTEGER NOT NULL DEFAULT 0",
+    ]),
+    Migration(11, "Rebuild per-user aggregates", [
+        # Concurrent upgrades could apply migration 6 batches twice, inflating the sums
+        "DELETE FROM user_stats",
+    ], [
+        Backfill("test_results", backfill_user_stats),
+    ]),
+    Migration(12, "Sync watermark instead of a per-result outbox", [
+        # Results with a higher id have not been acknowledged by the sync server
+        '''
+        CREATE TABLE IF NOT EXISTS sync_state (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            last_synced_id INTEGER NOT NULL
+        )
+        ''',
+        # The outbox only ever lost its oldest rows, so everything from its first row on is unsynced
+        '''
+        INSERT OR IGNORE INTO sync_state (id, last_synced_id)
+        SELECT 1, COALESCE((SELECT MIN(test_id) - 1 FROM sync_outbox), (SELECT MAX(id) FROM test_results), 0)
+        ''',
+        "DROP TABLE IF EXISTS sync_outbox",
+    ]),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1].version
+
+class MigrationRunner:
+    """Bring a database up to SCHEMA_VERSION, tracked with PRAGMA user_version"""
+
+    def __init__(self, db_manager, batch_size=5000):
+        self.db_manager = db_manager
+        self.batch_size = batch_size
+
+    def current_version(self):
+        """Schema version stored in the database file"""
+        return self.db_manager.execute("PRAGMA user_version").fetchone()[0]
+
+    def run(self):
+        """Apply all pending migrations, returning the number applied"""
+        if self.current_version() >= SCHEMA_VERSION:
+            return 0
+
+        self.db_manager.execute('''
+        CREATE TABLE IF NOT EXISTS migration_progress (
+            version INTEGER,
+            step INTEGER,
+            last_id INTEGER,
+            PRIMARY KEY (version, step)
+        )
+        ''')
+        self.db_manager.commit()
+
+        applied = 0
+        for migration in MIGRATIONS:
+            if migration.version > self.current_version():
+                self.apply(migration)
+                applied += 1
+        return applied
+
+    def apply(self, migration):
+        """Apply a single migration.
+
+        Completion of the statements is recorded as step -1 in the same
+        transaction, so a run interrupted during the backfills (or a second
+        instance starting meanwhile) resumes with them instead of repeating
+        statements such as ADD COLUMN that cannot run twice.
+        """
+        with self.db_manager.transaction() as cursor:
+            # Another instance may have migrated while we waited for the lock
+            if cursor.execute("PRAGMA user_version").fetchone()[0] >= migration.version:
+                return
+            statements_done = cursor.execute(
+                "SELECT 1 FROM migration_progress WHERE version = ? AND step = -1",
+                (migration.version,)
+            ).fetchone()
+            if not statements_done:
+                for statement in migration.statements:
+                    if callable(statement):
+                        statement(self.db_manager, cursor)
+                    else:
+                        cursor.execute(statement)
+                cursor.execute(
+                    "INSERT INTO migration_progress (version, step, last_id) VALUES (?, -1, 0)",
+                    (migration.version,)
+                )
+
+        for step, backfill in enumerate(migration.backfills):
+            self.run_backfill(migration.version, step, backfill)
+
+        with self.db_manager.transaction() as cursor:
+            if cursor.execute("PRAGMA user_version").fetchone()[0] >= migration.version:
+                return
+            cursor.execute("DELETE FROM migration_progress WHERE version = ?", (migration.version,))
+            cursor.execute(f"PRAGMA user_version = {int(migration.version)}")
+
+    def run_backfill(self, version, step, backfill):
+        """Run a backfill in batches, resuming from recorded progress.
+
+        Progress is re-read under the write lock of every batch, so when
+        several instances migrate the same database each batch is applied
+        by exactly one of them, in the transaction that records it.
+        """
+        max_id = self.db_manager.execute(
+            f"SELECT MAX({backfill.id_column}) FROM {backfill.table}"
+        ).fetchone()[0] or 0
+
+        while True:
+            with self.db_manager.transaction() as cursor:
+                # Another instance may have finished the migration or moved past this batch
+                if cursor.execute("PRAGMA user_version").fetchone()[0] >= version:
+                    return
+                row = cursor.execute(
+                    "SELECT last_id FROM migration_progress WHERE version = ? AND step = ?",
+                    (version, step)
+                ).fetchone()
+                last_id = row[0] if row else 0
+                if last_id >= max_id:
+                    return
+
+                # Find the upper id of the next batch through the primary key
+                row = cursor.execute(
+                    f"""SELECT {backfill.id_column} FROM {backfill.table}
+                        WHERE {backfill.id_column} > ? ORDER BY {backfill.id_column}
+                        LIMIT 1 OFFSET ?""",
+                    (last_id, self.batch_size - 1)
+                ).fetchone()
+                batch_end = row[0] if row else max_id
+
+                backfill.apply_batch(cursor, last_id, batch_end)
+                cursor.execute(
+                    "INSERT OR REPLACE INTO migration_progress (version, step, last_id) VALUES (?, ?, ?)",
+                    (version, step, batch_end)
+                )
@@ -0,0 +1,126 @@
+import tkinter as tk
+from tkinter import ttk
+
+class PagedTable:
+    """A ttk.Treeview that loads rows one page at a time as the user scrolls.
+
+    Treeview items are drawn only while visible, unlike a widget per cell.
+    fetch_page(after, limit) returns the rows following after, the last row
+    of the previous page (None for the first page); format_row(position,
+    row) turns a row into the displayed values. With a DatabaseExecutor
+    pages are fetched on its workers and added when they arrive.
+    """
+
+    STYLE = "TypeMaster.Treeview"
+
+    def __init__(self, parent, columns, fetch_page, format_row, page_size=100,
+                 height=15, empty_text="No data available.", executor=None):
+        """columns is a list of (heading, width, anchor) tuples"""
+        self.fetch_page = fetch_page
+        self.executor = executor
+        self.format_row = format_row
+        self.page_size = page_size
+
+        self.configure_style(parent)
+        self.frame = tk.Frame(parent, bg="#323437")
+
+        names = [f"c{i}" for i in range(len(columns))]
+        self.tree = ttk.Treeview(self.frame, columns=names, show="headings",
+                                 height=height, style=self.STYLE, selectmode="browse")
+        for name, (heading, width, anchor) in zip(names, columns):
+            self.tree.heading(name, text=heading)
+            self.tree.column(name, width=width, anchor=anchor, stretch=True)
+        self.tree.tag_configure("odd", background="#2c2e31")
+
+        self.scrollbar = ttk.Scrollbar(self.frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=self.on_scroll)
+        self.tree.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.empty_label = tk.Label(self.frame, text=empty_text, font=("Courier", 14),
+                                    bg="#323437", fg="#d1d0c5")
+
+        self.last_row = None
+        self.count = 0
+        self.exhausted = False
+        self.loading = False
+        self.load_scheduled = False
+        # Bumped by reset() so pages of an earlier source are dropped
+        self.generation = 0
+
+    @classmethod
+    def configure_style(cls, widget):
+        """Dark theme for the table (shared by every PagedTable)"""
+        style = ttk.Style(widget)
+        style.configure(cls.STYLE, background="#323437", fieldbackground="#323437",
+                        foreground="#d1d0c5", font=("Courier", 12), rowheight=24)
+        style.configure(cls.STYLE + ".Heading", background="#2c2e31", foreground="#d1d0c5",
+                        font=("Courier", 12, "bold"))
+        style.map(cls.STYLE, background=[("selected", "#e2b714")],
+                  foreground=[("selected", "#323437")])
+
+    def pack(self, **pack_options):
+        """Pack the table"""
+        self.frame.pack(**pack_options)
+
+    def reset(self, fetch_page=None):
+        """Clear the table and load the first page, optionally from a new source"""
+        if fetch_page is not None:
+            self.fetch_page = fetch_page
+        self.tree.delete(*self.tree.get_children())
+        self.last_row = None
+        self.count = 0
+        self.exhausted = False
+        self.loading = False
+        self.generation += 1
+        self.empty_label.place_forget()
+        self.load_more()
+
+    def load_more(self):
+        """Fetch the next page of rows"""
+        self.load_scheduled = False
+        if self.exhausted or self.loading:
+            return
+        self.loading = True
+        generation = self.generation
+        if self.executor is None:
+            try:
+                rows = self.fetch_page(self.last_row, self.page_size)
+            finally:
+                self.loading = False
+            self.add_rows(rows, generation)
+        else:
+            self.executor.submit(self.fetch_page, self.last_row, self.page_size,
+                                 callback=lambda rows: self.add_rows(rows, generation),
+                                 error_callback=lambda error: self.fetch_failed(error, generation))
+
+    def add_rows(self, rows, generation):
+        """Append a fetched page to the table"""
+        if generation != self.generation or not self.tree.winfo_exists():
+            return
+        self.loading = False
+        for row in rows:
+            self.tree.insert("", tk.END, values=self.format_row(self.count, row),
+                             tags=("odd",) if self.count % 2 else ())
+            self.count += 1
+        if rows:
+            self.last_row = rows[-1]
+        self.exhausted = len(rows) < self.page_size
+        if not self.count:
+            self.empty_label.place(relx=0.5, rely=0.5, anchor="center")
+
+    def fetch_failed(self, error, generation):
+        """Stop loading after a failed fetch"""
+        if generation != self.generation:
+            return
+        self.loading = False
+        self.exhausted = True
+        print(f"Error loading rows: {error}")
+
+    def on_scroll(self, first, last):
+        """Update the scrollbar and fetch another page near the bottom"""
+        self.scrollbar.set(first, last)
+        if float(last) > 0.9 and not self.exhausted and not self.load_scheduled:
+            # Outside the scroll callback, which fires while the tree is redrawing
+            self.load_scheduled = True
+            self.tree.after_idle(self.load_more)
@@ -0,0 +1,87 @@
+import hashlib
+import hmac
+import os
+import threading
+import time
+
+ALGORITHM = "pbkdf2_sha256"
+
+class PasswordHasher:
+    """Salted PBKDF2-SHA256 password hashes with a machine-calibrated cost.
+
+    Hashes are stored as "pbkdf2_sha256$iterations$salt$hash". The
+    iteration count is measured once per process so that hashing takes
+    about target_ms here, bounded by min_iterations and max_iterations.
+    Hashing is slow by design and must not run on the Tk thread.
+    """
+
+    def __init__(self, target_ms=250, min_iterations=100000, max_iterations=5000000,
+                 probe_iterations=20000, salt_bytes=16):
+        self.target_ms = target_ms
+        self.min_iterations = min_iterations
+        self.max_iterations = max_iterations
+        self.probe_iterations = probe_iterations
+        self.salt_bytes = salt_bytes
+        self._iterations = None
+        self._lock = threading.Lock()
+
+    @property
+    def iterations(self):
+        """Calibrated iteration count, measured on first use"""
+        if self._iterations is None:
+            self.calibrate()
+        return self._iterations
+
+    def calibrate(self):
+        """Time a short probe and scale the iteration count to the target latency"""
+        with self._lock:
+            if self._iterations is None:
+                start = time.perf_counter()
+                hashlib.pbkdf2_hmac("sha256", b"calibration", b"0" * self.salt_bytes, self.probe_iterations)
+                per_iteration = (time.perf_counter() - start) / self.probe_iterations
+                iterations = int(self.target_ms / 1000.0 / max(per_iteration, 1e-9))
+                iterations = min(max(iterations, self.min_iterations), self.max_iterations)
+                # Round so stored hashes don't record timing noise
+                self._iterations = iterations // 1000 * 1000
+        return self._iterations
+
+    def hash(self, password, iterations=None, salt=None):
+        """Hash a password with a new random salt"""
+        iterations = iterations or self.iterations
+        salt = salt or os.urandom(self.salt_bytes).hex()
+        return f"{ALGORITHM}${iterations}${salt}${pbkdf2_digest(password, salt, iterations)}"
+
+    def verify(self, password, stored):
+        """Check a password against a stored hash, PBKDF2 or legacy SHA-256"""
+        if not stored:
+            return False
+        if is_legacy(stored):
+            legacy = hashlib.sha256(password.encode()).hexdigest()
+            return hmac.compare_digest(legacy, stored)
+
+        try:
+            algorithm, iterations, salt, expected = stored.split("$")
+            iterations = int(iterations)
+        except ValueError:
+            return False
+        if algorithm != ALGORITHM:
+            return False
+        return hmac.compare_digest(pbkdf2_digest(password, salt, iterations), expected)
+
+    def needs_update(self, stored):
+        """Whether a stored hash is legacy or much cheaper than the current cost"""
+        if is_legacy(stored):
+            return True
+        try:
+            iterations = int(stored.split("$")[1])
+        except (IndexError, ValueError):
+            return True
+        return iterations < max(self.min_iterations, self.iterations // 2)
+
+def pbkdf2_digest(password, salt, iterations):
+    """Hex PBKDF2-SHA256 digest of a password"""
+    return hashlib.pbkdf2_hmac("sha256", password.encode(), salt.encode(), iterations).hex()
+
+def is_legacy(stored):
+    """Whether a stored hash is an unsalted SHA-256 hex digest"""
+    return "$" not in stored
@@ -0,0 +1,86 @@
+import csv
+import gzip
+import json
+import threading
+
+class ResultExporter:
+    """Stream test results to CSV or JSON Lines files, optionally gzip-compressed.
+
+    Rows are read with fetchmany and written as they arrive, so memory use
+    does not depend on how many results are exported.
+    """
+
+    FORMATS = ("csv", "jsonl", "csv.gz", "jsonl.gz")
+    COLUMNS = ["Test Mode", "Difficulty", "WPM", "Accuracy (%)", "Errors", "Duration (s)", "Timestamp"]
+    JSON_KEYS = ["test_mode", "difficulty", "wpm", "accuracy", "errors", "test_duration", "timestamp"]
+
+    def __init__(self, db_manager, batch_size=1000):
+        self.db_manager = db_manager
+        self.batch_size = batch_size
+
+    def format_for_path(self, path):
+        """Pick the export format from a file name, defaulting to CSV"""
+        name = path.lower()
+        for fmt in sorted(self.FORMATS, key=len, reverse=True):
+            if name.endswith("." + fmt):
+                return fmt
+        return "csv"
+
+    def export(self, path, username=None, fmt=None, progress_callback=None):
+        """Write results to path and return the number of rows written.
+
+        With username=None the results of all users are exported and a
+        username column is added. progress_callback(done, total) is called
+        after every batch.
+        """
+        fmt = fmt or self.format_for_path(path)
+        if fmt not in self.FORMATS:
+            raise ValueError(f"Unsupported export format: {fmt}")
+
+        total = self.db_manager.count_results(username)
+        columns = self.COLUMNS if username else ["Username"] + self.COLUMNS
+        keys = self.JSON_KEYS if username else ["username"] + self.JSON_KEYS
+
+        if fmt.endswith(".gz"):
+            file = gzip.open(path, "wt", newline="", encoding="utf-8")
+        else:
+            file = open(path, "w", newline="", encoding="utf-8")
+
+        written = 0
+        with file:
+            if fmt.startswith("csv"):
+                writer = csv.writer(file)
+                writer.writerow(columns)
+                write_rows = writer.writerows
+            else:
+                def write_rows(rows):
+                    file.writelines(json.dumps(dict(zip(keys, row))) + "\n" for row in rows)
+
+            for batch in self.db_manager.iter_results(username, self.batch_size):
+                write_rows(batch)
+                written += len(batch)
+                if progress_callback:
+                    progress_callback(written, total)
+        return written
+
+    def export_async(self, path, username=None, fmt=None, progress_callback=None, done_callback=None):
+        """Run export() on a background thread.
+
+        done_callback(rows_written, error) is called from that thread when
+        the export finishes; callers must hand results back to Tk themselves.
+        """
+        def run():
+            try:
+                written = self.export(path, username, fmt, progress_callback)
+            except Exception as e:
+                if done_callback:
+                    done_callback(0, e)
+                return
+            finally:
+                self.db_manager.release_connection()
+            if done_callback:
+                done_callback(written, None)
+
+        thread = threading.Thread(target=run, name="result-export", daemon=True)
+        thread.start()
+        return thread
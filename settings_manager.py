@@ -10,7 +10,13 @@ class SettingsManager:
         self.settings = {
             "sound_enabled": True,
             "theme": "dark",
-            "font_size": 18
+            "font_size": 18,
+            # Draw a live WPM/accuracy chart during tests
+            "live_chart": False,
+            # Developer overlay with key-to-paint latency and event-loop lag
+            "latency_overlay": False,
+            # Mixer buffer in samples; smaller buffers lower key-sound latency
+            "sound_buffer": 512
         }
     
     def get_font_size(self):
@@ -115,6 +121,20 @@ class SettingsManager:
                                 values=theme_options, state="readonly")
         theme_menu.grid(row=0, column=1, padx=10)
         
+        # Live chart setting
+        live_chart_var = tk.BooleanVar(value=self.settings["live_chart"])
+        live_chart_check = tk.Checkbutton(appearance_frame, text="Show Live WPM Chart During Tests", 
+                                        variable=live_chart_var, bg="#323437", fg="#d1d0c5",
+                                        selectcolor="#323437", activebackground="#323437")
+        live_chart_check.pack(padx=10, pady=10, anchor='w')
+        
+        # Latency overlay setting
+        latency_overlay_var = tk.BooleanVar(value=self.settings["latency_overlay"])
+        latency_overlay_check = tk.Checkbutton(appearance_frame, text="Show Latency Overlay (Developer)", 
+                                             variable=latency_overlay_var, bg="#323437", fg="#d1d0c5",
+                                             selectcolor="#323437", activebackground="#323437")
+        latency_overlay_check.pack(padx=10, pady=10, anchor='w')
+        
         # Sound settings tab
         sound_frame = tk.Frame(notebook, bg="#323437")
         notebook.add(sound_frame, text="Sound")
@@ -140,6 +160,8 @@ class SettingsManager:
                                   theme_var.get(),
 
                                   sound_var.get(),
+                                  live_chart_var.get(),
+                                  latency_overlay_var.get(),
                                   settings_dialog
                               ))
         save_button.grid(row=0, column=0, padx=10)
@@ -152,12 +174,33 @@ class SettingsManager:
     
     def display_user_profile(self, frame, username):
         """Display user profile information"""
-        # Get user data from database
-        self.parent_app.db_manager.cursor.execute(
+        loading_label = tk.Label(frame, text="Loading profile...", 
+                               font=("Courier", 12), bg="#323437", fg="#d1d0c5")
+        loading_label.pack(pady=20)
+        
+        # Get user data from database on a worker
+        self.parent_app.db_executor.submit(
+            self.load_user_profile, username,
+            callback=lambda profile: self.show_user_profile(frame, *profile)
+        )
+    
+    def load_user_profile(self, username):
+        """Read the user row and per-mode aggregates (runs on a worker)"""
+        db_manager = self.parent_app.db_manager
+        user_data = db_manager.execute(
             "SELECT username, email, tests_completed, avg_wpm, avg_accuracy, date_joined FROM users WHERE username = ?",
             (username,)
-        )
-        user_data = self.parent_app.db_manager.cursor.fetchone()
+        ).fetchone()
+        aggregates = db_manager.get_user_aggregates(username) if user_data else []
+        return user_data, aggregates
+    
+    def show_user_profile(self, frame, user_data, aggregates):
+        """Build the profile labels from loaded data"""
+        # The settings dialog was closed while loading
+        if not frame.winfo_exists():
+            return
+        for widget in frame.winfo_children():
+            widget.destroy()
         
         if not user_data:
             error_label = tk.Label(frame, text="Error: User data not found", 
@@ -230,12 +273,47 @@ class SettingsManager:
         acc_value = tk.Label(info_frame, text=f"{avg_accuracy:.1f}%" if avg_accuracy else "N/A", 
                            font=("Courier", 12), bg="#323437", fg="#d1d0c5")
         acc_value.grid(row=5, column=1, sticky='w', pady=5)
+        
+        # Per-mode aggregates
+        if aggregates:
+            best_wpm = max(entry["best_wpm"] for entry in aggregates)
+            mode_counts = ", ".join(f"{entry['mode'].title()} {entry['tests']}" for entry in aggregates)
+            
+            # Best WPM
+            best_label = tk.Label(info_frame, text="Best WPM:", 
+                                font=("Courier", 12, "bold"), bg="#323437", fg="#d1d0c5")
+            best_label.grid(row=6, column=0, sticky='w', pady=5, padx=10)
+            
+            best_value = tk.Label(info_frame, text=f"{best_wpm:.1f}", 
+                                font=("Courier", 12), bg="#323437", fg="#d1d0c5")
+            best_value.grid(row=6, column=1, sticky='w', pady=5)
+            
+            # WPM spread of the most played mode
+            main_mode = aggregates[0]
+            spread_label = tk.Label(info_frame, text="WPM Std. Dev.:", 
+                                  font=("Courier", 12, "bold"), bg="#323437", fg="#d1d0c5")
+            spread_label.grid(row=7, column=0, sticky='w', pady=5, padx=10)
+            
+            spread_value = tk.Label(info_frame, text=f"{main_mode['wpm_stddev']:.1f} ({main_mode['mode'].title()})", 
+                                  font=("Courier", 12), bg="#323437", fg="#d1d0c5")
+            spread_value.grid(row=7, column=1, sticky='w', pady=5)
+            
+            # Tests by mode
+            modes_label = tk.Label(info_frame, text="Tests by Mode:", 
+                                 font=("Courier", 12, "bold"), bg="#323437", fg="#d1d0c5")
+            modes_label.grid(row=8, column=0, sticky='w', pady=5, padx=10)
+            
+            modes_value = tk.Label(info_frame, text=mode_counts, 
+                                 font=("Courier", 12), bg="#323437", fg="#d1d0c5")
+            modes_value.grid(row=8, column=1, sticky='w', pady=5)
     
-    def save_settings(self, theme, sound_enabled, dialog):
+    def save_settings(self, theme, sound_enabled, live_chart, latency_overlay, dialog):
         """Save settings and apply changes"""
         # Update settings
         self.settings["theme"] = theme
         self.settings["sound_enabled"] = sound_enabled
+        self.settings["live_chart"] = live_chart
+        self.settings["latency_overlay"] = latency_overlay
         
         # Apply theme
         self.apply_theme(theme)
@@ -1,59 +1,173 @@
 import os
-import pygame
 import threading
+import time
+
+# pygame is imported when the mixer is first opened, see load_pygame()
+pygame = None
+
+# Decoded sounds shared by every SoundManager: (path, mixer settings) -> pygame Sound
+_sound_cache = {}
+
+def load_pygame():
+    """Import pygame on first use, keeping it out of application startup"""
+    global pygame
+    if pygame is None:
+        import pygame as module
+        pygame = module
+    return pygame
 
 class SoundManager:
-    def __init__(self):
+    """Play key, error and completion sounds with low, steady latency.
+
+    The mixer is opened with a small buffer, every MP3 is decoded to PCM
+    once and cached, and each sound plays on its own reserved channels,
+    so playback is a single non-blocking Channel.play call from the key
+    handler without starting any threads.
+
+    The mixer is opened ahead of time by init_mixer() on a background
+    thread. Sounds played before it is ready are skipped, and the first
+    one starts opening it in the background if nothing else has.
+    """
+
+    SOUND_FILES = {
+        "key": "keypress.mp3",
+        "error": "error.mp3",
+        "complete": "complete.mp3"
+    }
+
+    # Reserved channels per sound; key sounds rotate through theirs so fast
+    # typing overlaps instead of cutting each click off
+    CHANNELS = {
+        "key": 4,
+        "error": 1,
+        "complete": 1
+    }
+
+    def __init__(self, buffer_size=512, frequency=44100, error_interval=0.08):
         """Initialize the sound manager"""
-        # Initialize pygame mixer for sound playback
-        pygame.mixer.init()
+        self.buffer_size = buffer_size
+        self.frequency = frequency
+        self.error_interval = error_interval
         
         # Set default sound enabled status
         self.sound_enabled = True
         
-        # Load sound files
         self.sounds = {}
+        self.channels = {}
+        self.next_channel = {}
+        self.last_played = {}
+        
+        # None until the mixer has been opened, then whether that worked
+        self.mixer_ready = None
+        self.mixer_lock = threading.Lock()
+        self.mixer_thread = None
+    
+    def init_mixer(self):
+        """Open the mixer and load the sounds, returning True if sound is available.
+
+        Slow on first call; meant for a background thread, never the Tk thread.
+        """
+        if self.mixer_ready is not None:
+            return self.mixer_ready
+        with self.mixer_lock:
+            if self.mixer_ready is None:
+                self.mixer_ready = self._open_mixer()
+            return self.mixer_ready
+    
+    def init_mixer_async(self):
+        """Open the mixer on a background thread, unless that was already started"""
+        if self.mixer_ready is not None or self.mixer_thread is not None:
+            return
+        self.mixer_thread = threading.Thread(target=self.init_mixer, name="mixer-init", daemon=True)
+        self.mixer_thread.start()
+    
+    def _open_mixer(self):
+        """Initialize pygame mixer for sound playback"""
+        try:
+            load_pygame()
+        except ImportError as e:
+            print(f"Sound disabled, pygame is not available: {e}")
+            return False
+        
+        try:
+            # A small buffer keeps the delay between play() and audible output short
+            pygame.mixer.pre_init(self.frequency, -16, 2, self.buffer_size)
+            pygame.mixer.init()
+        except pygame.error as e:
+            print(f"Sound disabled, audio device unavailable: {e}")
+            return False
+        
         self.load_sounds()
+        self.reserve_channels()
+        return True
     
     def load_sounds(self):
-        """Load sound effects"""
+        """Load sound effects, decoding each file only once"""
         # Create sounds directory if it doesn't exist
         if not os.path.exists("sounds"):
             os.makedirs("sounds")
             print("Created 'sounds' directory. Please add sound files to this directory.")
             return
         
-        # Try to load key sound
-        key_sound_path = os.path.join("sounds", "keypress.mp3")
-        if os.path.exists(key_sound_path):
-            self.sounds["key"] = pygame.mixer.Sound(key_sound_path)
-        else:
-            print(f"Key sound file not found at: {key_sound_path}")
-        
-        # Try to load error sound
-        error_sound_path = os.path.join("sounds", "error.mp3")
-        if os.path.exists(error_sound_path):
-            self.sounds["error"] = pygame.mixer.Sound(error_sound_path)
+        mixer_settings = pygame.mixer.get_init()
+        for name, file_name in self.SOUND_FILES.items():
+            path = os.path.join("sounds", file_name)
+            if not os.path.exists(path):
+                print(f"Sound file not found at: {path}")
+                continue
+            
+            key = (os.path.abspath(path), mixer_settings)
+            sound = _sound_cache.get(key)
+            if sound is None:
+                # Sound() decodes the whole MP3 into PCM in the mixer format
+                sound = pygame.mixer.Sound(path)
+                _sound_cache[key] = sound
+            self.sounds[name] = sound
+    
+    def reserve_channels(self):
+        """Set aside a fixed pool of mixer channels for each sound"""
+        total = sum(self.CHANNELS.values())
+        if pygame.mixer.get_num_channels() < total:
+            pygame.mixer.set_num_channels(total)
+        # Reserved channels are never handed out by Sound.play() elsewhere
+        pygame.mixer.set_reserved(total)
         
-        # Try to load completion sound
-        complete_sound_path = os.path.join("sounds", "complete.mp3")
-        if os.path.exists(complete_sound_path):
-            self.sounds["complete"] = pygame.mixer.Sound(complete_sound_path)
+        channel_id = 0
+        for name, count in self.CHANNELS.items():
+            self.channels[name] = [pygame.mixer.Channel(channel_id + i) for i in range(count)]
+            self.next_channel[name] = 0
+            channel_id += count
+    
+    @property
+    def latency_ms(self):
+        """Delay added by the mixer buffer, in milliseconds"""
+        mixer_settings = self.mixer_ready and pygame.mixer.get_init()
+        if not mixer_settings:
+            return 0.0
+        return self.buffer_size / mixer_settings[0] * 1000
     
     def play_sound(self, sound_name):
         """Play a sound if sound is enabled"""
         if not self.sound_enabled:
             return
+        # Never open the mixer or wait for it from the key handler
+        if self.mixer_ready is None:
+            self.init_mixer_async()
+            return
+        if not self.mixer_ready:
+            return
         
-        if sound_name in self.sounds:
-            # Play sound in a separate thread to prevent UI freezing
-            threading.Thread(target=self._play_sound_thread, args=(sound_name,)).start()
-    
-    def _play_sound_thread(self, sound_name):
-        """Thread function to play sound"""
+        sound = self.sounds.get(sound_name)
+        if sound is None:
+            return
+        
+        # Rotate through the sound's channels; the oldest playback is replaced
+        channels = self.channels[sound_name]
+        index = self.next_channel[sound_name]
+        self.next_channel[sound_name] = (index + 1) % len(channels)
         try:
-            self.sounds[sound_name].play()
-        except Exception as e:
+            channels[index].play(sound)
+        except pygame.error as e:
             print(f"Error playing sound {sound_name}: {e}")
     
     def play_key_sound(self):
@@ -61,7 +175,11 @@ class SoundManager:
         self.play_sound("key")
     
     def play_error_sound(self):
-        """Play error sound"""
+        """Play error sound, at most once per error interval"""
+        now = time.perf_counter()
+        if now - self.last_played.get("error", float("-inf")) < self.error_interval:
+            return
+        self.last_played["error"] = now
         self.play_sound("error")
     
     def play_complete_sound(self):
@@ -1,40 +1,37 @@
 import tkinter as tk
 from tkinter import ttk
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import numpy as np
 from datetime import datetime
 import matplotlib.dates as mdates
+from chart_data import MAX_POINTS, load_progress, lttb, trend
+from figure_pool import figure_pool
+from paged_table import PagedTable
 
 class StatsVisualizer:
-    def __init__(self, parent_frame, db_manager):
+    # Progress chart choices: label -> aggregation period
+    PROGRESS_PERIODS = {
+        "All Tests": None,
+        "Daily Average": "day",
+        "Weekly Average": "week"
+    }
+    # Lines with more points than this are drawn without markers
+    MARKER_LIMIT = 200
+    
+    def __init__(self, parent_frame, db_manager, db_executor=None):
         """Initialize the stats visualizer with a parent frame and database manager"""
         self.parent_frame = parent_frame
         self.db_manager = db_manager
+        self.db_executor = db_executor
         
-    def create_wpm_graph(self, wpm_over_time, final_wpm):
-        """Create a graph showing WPM over time for a single test"""
-        # Create figure and axis
-        fig = plt.Figure(figsize=(6, 3), dpi=100)
-        ax = fig.add_subplot(111)
-        
-        # Plot WPM over time
-        if wpm_over_time:
-            time_points = list(range(1, len(wpm_over_time) + 1))
-            ax.plot(time_points, wpm_over_time, marker='o', linestyle='-', color='#e2b714')
-            
-            # Add horizontal line for final WPM
-            ax.axhline(y=final_wpm, color='#d1d0c5', linestyle='--', alpha=0.7)
-            
-            # Add text for final WPM
-            ax.text(len(time_points) * 0.8, final_wpm * 1.05, f"Final WPM: {final_wpm:.1f}", 
-                   color='#d1d0c5', fontsize=9)
+    def run_query(self, func, *args, callback):
+        """Call func on a database worker if there is an executor, otherwise right away"""
+        if self.db_executor is None:
+            callback(func(*args))
         else:
-            ax.text(0.5, 0.5, "No data available", 
-                   horizontalalignment='center', verticalalignment='center',
-                   transform=ax.transAxes, color='#d1d0c5')
+            self.db_executor.submit(func, *args, callback=callback)
         
-        # Configure appearance
+    def style_axes(self, fig, ax):
+        """Apply the dark theme to a new figure"""
         ax.set_facecolor('#2c2e31')
         fig.patch.set_facecolor('#323437')
         ax.spines['bottom'].set_color('#d1d0c5')
@@ -42,14 +39,40 @@ class StatsVisualizer:
         ax.spines['left'].set_color('#d1d0c5')
         ax.spines['right'].set_color('#2c2e31')
         ax.tick_params(axis='both', colors='#d1d0c5')
+    
+    def setup_wpm_graph(self, fig, ax):
+        """Style a new single-test WPM figure"""
+        self.style_axes(fig, ax)
         ax.set_title('WPM Over Time', color='#d1d0c5')
         ax.set_xlabel('Time (seconds)', color='#d1d0c5')
         ax.set_ylabel('WPM', color='#d1d0c5')
+    
+    def create_wpm_graph(self, wpm_over_time, final_wpm):
+        """Create a graph showing WPM over time for a single test"""
+        # Reuse a pooled figure, moving its lines to the new data
+        pooled = figure_pool.acquire("wpm", (6, 3), setup=self.setup_wpm_graph)
+        ax = pooled.ax
+        
+        # Plot WPM over time
+        if wpm_over_time:
+            time_points = np.arange(1, len(wpm_over_time) + 1)
+            pooled.line("wpm", time_points, wpm_over_time, marker='o', linestyle='-', color='#e2b714')
+            
+            # Add horizontal line for final WPM
+            pooled.line("final", [0, 1], [final_wpm, final_wpm], transform=ax.get_yaxis_transform(),
+                        color='#d1d0c5', linestyle='--', alpha=0.7)
+            
+            # Add text for final WPM
+            pooled.text("final_label", len(time_points) * 0.8, final_wpm * 1.05, f"Final WPM: {final_wpm:.1f}", 
+                        color='#d1d0c5', fontsize=9)
+        else:
+            pooled.text("no_data", 0.5, 0.5, "No data available", 
+                        horizontalalignment='center', verticalalignment='center',
+                        transform=ax.transAxes, color='#d1d0c5')
+        pooled.rescale()
         
         # Create canvas and add to parent frame
-        canvas = FigureCanvasTkAgg(fig, master=self.parent_frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(pady=10, padx=10, fill=tk.BOTH, expand=True)
+        figure_pool.show(pooled, self.parent_frame, pady=10, padx=10, fill=tk.BOTH, expand=True)
     
     def show_progress_window(self, username):
         """Show a window with user progress over time"""
@@ -58,30 +81,63 @@ class StatsVisualizer:
         progress_window.title(f"Typing Progress - {username}")
         progress_window.geometry("800x600")
         progress_window.configure(bg="#323437")
+        figure_pool.manage_window(progress_window)
+        
+        loading_label = tk.Label(progress_window, text="Loading...", 
+                               font=("Courier", 16), bg="#323437", fg="#d1d0c5")
+        loading_label.pack(expand=True)
         
         # Get user progress data
-        progress_data = self.db_manager.get_user_progress(username)
+        self.run_query(load_progress, self.db_manager, username,
+                       callback=lambda progress_data: self.fill_progress_window(progress_window, username, progress_data))
+    
+    def fill_progress_window(self, progress_window, username, progress_data):
+        """Add the progress graphs and summary once the data has loaded"""
+        # The window was closed while loading
+        if not progress_window.winfo_exists():
+            return
+        for widget in progress_window.winfo_children():
+            widget.destroy()
         
-        if not progress_data:
+        if not len(progress_data):
             # No data available
             no_data_label = tk.Label(progress_window, text="No typing test data available.", 
                                    font=("Courier", 16), bg="#323437", fg="#d1d0c5")
             no_data_label.pack(expand=True)
             return
         
+        # Aggregation selector
+        period_frame = tk.Frame(progress_window, bg="#323437")
+        period_frame.pack(fill=tk.X, padx=10, pady=(10, 0))
+        
+        period_var = tk.StringVar(value="All Tests")
+        period_menu = ttk.Combobox(period_frame, textvariable=period_var, 
+                                 values=list(self.PROGRESS_PERIODS), state="readonly", width=15)
+        period_menu.pack(side=tk.RIGHT)
+        
         # Create notebook for tabs
         notebook = ttk.Notebook(progress_window)
         
         # Create WPM progress tab
         wpm_frame = tk.Frame(notebook, bg="#323437")
-        self.create_progress_graph(wpm_frame, progress_data, "wpm", "WPM Progress Over Time")
         notebook.add(wpm_frame, text="WPM Progress")
         
         # Create accuracy progress tab
         accuracy_frame = tk.Frame(notebook, bg="#323437")
-        self.create_progress_graph(accuracy_frame, progress_data, "accuracy", "Accuracy Progress Over Time")
         notebook.add(accuracy_frame, text="Accuracy Progress")
         
+        def draw_graphs(event=None):
+            """Draw both progress graphs for the selected aggregation"""
+            period = self.PROGRESS_PERIODS[period_var.get()]
+            for frame in (wpm_frame, accuracy_frame):
+                for widget in frame.winfo_children():
+                    widget.destroy()
+            self.create_progress_graph(wpm_frame, progress_data, "wpm", "WPM Progress Over Time", period)
+            self.create_progress_graph(accuracy_frame, progress_data, "accuracy", "Accuracy Progress Over Time", period)
+        
+        draw_graphs()
+        period_menu.bind("<<ComboboxSelected>>", draw_graphs)
+        
         # Create statistics tab
         stats_frame = tk.Frame(notebook, bg="#323437")
         self.create_stats_summary(stats_frame, username, progress_data)
@@ -92,81 +148,86 @@ class StatsVisualizer:
         # Add close button
         close_button = tk.Button(progress_window, text="Close", font=("Courier", 12),
                                bg="#e2b714", fg="#323437", width=10,
-                               command=progress_window.destroy)
+                               command=lambda: figure_pool.close_window(progress_window))
         close_button.pack(pady=10)
     
-    def create_progress_graph(self, parent_frame, progress_data, data_type, title):
-        """Create a graph showing progress over time for WPM or accuracy"""
+    def create_progress_graph(self, parent_frame, progress_data, data_type, title, period=None):
+        """Create a graph showing progress over time for WPM or accuracy.
+        
+        Tests are optionally averaged per day or week, and long series are
+        downsampled with LTTB so drawing cost does not grow with history length.
+        """
         # Extract data
-        y_values = [row[0] if data_type == "wpm" else row[1] for row in progress_data]
-        timestamps = [datetime.strptime(row[2], "%Y-%m-%d %H:%M:%S") for row in progress_data]
+        series = progress_data.aggregate(period)
+        values = series.column(data_type)
+        shown = lttb(series.times, values, MAX_POINTS)
         
-        # Create figure and axis
-        fig = plt.Figure(figsize=(10, 6), dpi=100)
-        ax = fig.add_subplot(111)
+        # Reuse a pooled figure, moving its lines to the new data
+        pooled = figure_pool.acquire("progress", (10, 6), setup=self.setup_progress_graph)
+        ax = pooled.ax
         
         # Plot data
-        ax.plot(timestamps, y_values, marker='o', linestyle='-', color='#e2b714')
-        
-        # Add trend line
-        if len(y_values) > 1:
-            z = np.polyfit(range(len(timestamps)), y_values, 1)
-            p = np.poly1d(z)
-            ax.plot(timestamps, p(range(len(timestamps))), "r--", alpha=0.7, label="Trend")
+        marker = 'o' if len(shown) <= self.MARKER_LIMIT else ''
+        pooled.line("values", series.dates(series.times[shown]), values[shown],
+                    marker=marker, linestyle='-', color='#e2b714')
+        
+        # Add trend line, fitted to every point but drawn through its two ends
+        if len(values) > 1:
+            slope, intercept = trend(values)
+            ends = np.array([0, len(values) - 1])
+            pooled.line("trend", series.dates(series.times[ends]), intercept + slope * ends,
+                        color='r', linestyle='--', alpha=0.7, label="Trend")
             
             # Add text indicating improvement
-            slope = z[0]
+            unit = {"day": "per practice day", "week": "per practice week"}.get(period, "per test")
             if slope > 0:
-                trend_text = f"Improving: +{slope:.2f} per test"
+                trend_text = f"Improving: +{slope:.2f} {unit}"
             elif slope < 0:
-                trend_text = f"Declining: {slope:.2f} per test"
+                trend_text = f"Declining: {slope:.2f} {unit}"
             else:
                 trend_text = "No change over time"
                 
-            ax.text(0.02, 0.95, trend_text, transform=ax.transAxes, 
-                   color='#d1d0c5', fontsize=10)
+            pooled.text("trend_text", 0.02, 0.95, trend_text, transform=ax.transAxes, 
+                        color='#d1d0c5', fontsize=10)
         
-        # Configure date formatting
-        ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
-        fig.autofmt_xdate()
-        
-        # Configure appearance
-        ax.set_facecolor('#2c2e31')
-        fig.patch.set_facecolor('#323437')
-        ax.spines['bottom'].set_color('#d1d0c5')
-        ax.spines['top'].set_color('#2c2e31')
-        ax.spines['left'].set_color('#d1d0c5')
-        ax.spines['right'].set_color('#2c2e31')
-        ax.tick_params(axis='both', colors='#d1d0c5')
         ax.set_title(title, color='#d1d0c5')
-        ax.set_xlabel('Date', color='#d1d0c5')
-        
         if data_type == "wpm":
             ax.set_ylabel('Words Per Minute', color='#d1d0c5')
+            ax.set_autoscaley_on(True)
+            pooled.rescale()
         else:
             ax.set_ylabel('Accuracy (%)', color='#d1d0c5')
+            pooled.rescale()
             ax.set_ylim(0, 100)
         
         # Create canvas and add to parent frame
-        canvas = FigureCanvasTkAgg(fig, master=parent_frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(pady=10, padx=10, fill=tk.BOTH, expand=True)
+        figure_pool.show(pooled, parent_frame, pady=10, padx=10, fill=tk.BOTH, expand=True)
+    
+    def setup_progress_graph(self, fig, ax):
+        """Style a new progress figure"""
+        # Configure date formatting
+        ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
+        fig.autofmt_xdate()
+        
+        # Configure appearance
+        self.style_axes(fig, ax)
+        ax.set_xlabel('Date', color='#d1d0c5')
     
     def create_stats_summary(self, parent_frame, username, progress_data):
         """Create a summary of user statistics"""
         # Calculate statistics
-        wpm_values = [row[0] for row in progress_data]
-        accuracy_values = [row[1] for row in progress_data]
+        wpm_values = progress_data.wpm
+        accuracy_values = progress_data.accuracy
         
-        avg_wpm = sum(wpm_values) / len(wpm_values)
-        max_wpm = max(wpm_values)
-        avg_accuracy = sum(accuracy_values) / len(accuracy_values)
-        max_accuracy = max(accuracy_values)
+        avg_wpm = wpm_values.mean()
+        max_wpm = wpm_values.max()
+        avg_accuracy = accuracy_values.mean()
+        max_accuracy = accuracy_values.max()
         tests_completed = len(progress_data)
         
-        # Find most recent highest WPM
-        highest_wpm_index = wpm_values.index(max_wpm)
-        highest_wpm_date = datetime.strptime(progress_data[highest_wpm_index][2], "%Y-%m-%d %H:%M:%S")
+        # Find the date of the highest WPM
+        highest_wpm_index = int(wpm_values.argmax())
+        highest_wpm_date = progress_data.dates()[highest_wpm_index].astype(datetime)
         
         # Create stats frame
         stats_container = tk.Frame(parent_frame, bg="#323437")
@@ -247,6 +308,38 @@ class StatsVisualizer:
                             anchor="w", width=10)
         date_value.grid(row=5, column=1, sticky="w", pady=5)
     
+    # Leaderboard filter choices: label -> (mode, value) and label -> time window
+    LEADERBOARD_MODES = {
+        "All Modes": (None, None),
+        "Time: 15s": ("time", 15),
+        "Time: 30s": ("time", 30),
+        "Time: 60s": ("time", 60),
+        "Time: 120s": ("time", 120),
+        "Words: 10": ("words", 10),
+        "Words: 25": ("words", 25),
+        "Words: 50": ("words", 50),
+        "Words: 100": ("words", 100),
+        "Paragraph": ("paragraph", None),
+        "Endless": ("endless", None),
+        "Custom": ("custom", None)
+    }
+    LEADERBOARD_WINDOWS = {
+        "All Time": "all",
+        "This Month": "month",
+        "This Week": "week",
+        "Today": "day"
+    }
+    # Leaderboard table columns: (heading, width, anchor)
+    LEADERBOARD_COLUMNS = [
+        ("Rank", 60, "center"),
+        ("Username", 150, "w"),
+        ("WPM", 80, "e"),
+        ("Accuracy", 100, "e"),
+        ("Mode", 100, "center"),
+        ("Difficulty", 110, "center"),
+        ("Date", 110, "center")
+    ]
+    
     def show_leaderboard(self):
         """Show a window with the global leaderboard"""
         # Create new toplevel window
@@ -254,108 +347,109 @@ class StatsVisualizer:
         leaderboard_window.title("Typing Speed Leaderboard")
         leaderboard_window.geometry("700x500")
         leaderboard_window.configure(bg="#323437")
+        figure_pool.manage_window(leaderboard_window)
         
         # Title
         title_label = tk.Label(leaderboard_window, text="Global Leaderboard", 
                              font=("Courier", 20, "bold"), bg="#323437", fg="#e2b714")
         title_label.pack(pady=20)
         
-        # Get leaderboard data
-        leaderboard_data = self.db_manager.get_leaderboard(20)  # Get top 20
+        # Filters
+        filter_frame = tk.Frame(leaderboard_window, bg="#323437")
+        filter_frame.pack(pady=(0, 10))
         
-        if not leaderboard_data:
-            # No data available
-            no_data_label = tk.Label(leaderboard_window, text="No leaderboard data available yet.", 
-                                   font=("Courier", 16), bg="#323437", fg="#d1d0c5")
-            no_data_label.pack(expand=True)
-        else:
-            # Create scrollable frame for leaderboard
-            container = tk.Frame(leaderboard_window, bg="#323437")
-            container.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
-            
-            # Create canvas
-            canvas = tk.Canvas(container, bg="#323437", highlightthickness=0)
-            scrollbar = ttk.Scrollbar(container, orient="vertical", command=canvas.yview)
-            scrollable_frame = tk.Frame(canvas, bg="#323437")
-            
-            scrollable_frame.bind(
-                "<Configure>",
-                lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
-            )
-            
-            canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
-            canvas.configure(yscrollcommand=scrollbar.set)
-            
-            # Pack scrollbar and canvas
-            canvas.pack(side="left", fill="both", expand=True)
-            scrollbar.pack(side="right", fill="y")
-            
-            # Create headers
-            headers_frame = tk.Frame(scrollable_frame, bg="#2c2e31")
-            headers_frame.pack(fill=tk.X, pady=(0, 2))
-            
-            # Header labels
-            headers = ["Rank", "Username", "WPM", "Accuracy", "Mode", "Difficulty", "Date"]
-            widths = [5, 15, 8, 10, 10, 12, 20]
+        mode_var = tk.StringVar(value="All Modes")
+        mode_menu = ttk.Combobox(filter_frame, textvariable=mode_var, 
+                               values=list(self.LEADERBOARD_MODES), state="readonly", width=12)
+        mode_menu.grid(row=0, column=0, padx=10)
+        
+        window_var = tk.StringVar(value="All Time")
+        window_menu = ttk.Combobox(filter_frame, textvariable=window_var, 
+                                 values=list(self.LEADERBOARD_WINDOWS), state="readonly", width=12)
+        window_menu.grid(row=0, column=1, padx=10)
+        
+        # Table, reloaded from the first page whenever a filter changes
+        table = PagedTable(leaderboard_window, self.LEADERBOARD_COLUMNS, None, self.format_leaderboard_row,
+                           empty_text="No leaderboard data available yet.", executor=self.db_executor)
+        table.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
+        
+        def refresh(event=None):
+            mode, value = self.LEADERBOARD_MODES[mode_var.get()]
+            window = self.LEADERBOARD_WINDOWS[window_var.get()]
             
-            for i, (header, width) in enumerate(zip(headers, widths)):
-                header_label = tk.Label(headers_frame, text=header, 
-                                      font=("Courier", 12, "bold"), bg="#2c2e31", fg="#d1d0c5",
-                                      width=width)
-                header_label.grid(row=0, column=i, padx=2, pady=5)
+            def fetch_page(last_row, limit):
+                after = (last_row[1], last_row[0]) if last_row else None
+                return self.db_manager.get_leaderboard_page(limit, after, mode=mode, value=value, window=window)
             
-            # Add leaderboard entries
-            for i, entry in enumerate(leaderboard_data):
-                # Alternate row colors
-                bg_color = "#323437" if i % 2 == 0 else "#2c2e31"
-                
-                row_frame = tk.Frame(scrollable_frame, bg=bg_color)
-                row_frame.pack(fill=tk.X, pady=1)
-                
-                # Rank
-                rank_label = tk.Label(row_frame, text=str(i+1), 
-                                    font=("Courier", 12), bg=bg_color, fg="#d1d0c5",
-                                    width=widths[0])
-                rank_label.grid(row=0, column=0, padx=2, pady=3)
-                
-                # Username
-                username_label = tk.Label(row_frame, text=entry[0], 
-                                        font=("Courier", 12), bg=bg_color, fg="#e2b714",
-                                        width=widths[1])
-                username_label.grid(row=0, column=1, padx=2, pady=3)
-                
-                # WPM
-                wpm_label = tk.Label(row_frame, text=f"{entry[1]:.1f}", 
-                                   font=("Courier", 12), bg=bg_color, fg="#d1d0c5",
-                                   width=widths[2])
-                wpm_label.grid(row=0, column=2, padx=2, pady=3)
-                
-                # Accuracy
-                accuracy_label = tk.Label(row_frame, text=f"{entry[2]:.1f}%", 
-                                        font=("Courier", 12), bg=bg_color, fg="#d1d0c5",
-                                        width=widths[3])
-                accuracy_label.grid(row=0, column=3, padx=2, pady=3)
-                
-                # Mode
-                mode_label = tk.Label(row_frame, text=entry[3].title(), 
-                                    font=("Courier", 12), bg=bg_color, fg="#d1d0c5",
-                                    width=widths[4])
-                mode_label.grid(row=0, column=4, padx=2, pady=3)
-                
-                # Difficulty
-                difficulty_label = tk.Label(row_frame, text=entry[4].title(), 
-                                          font=("Courier", 12), bg=bg_color, fg="#d1d0c5",
-                                          width=widths[5])
-                difficulty_label.grid(row=0, column=5, padx=2, pady=3)
-                
-                # Date
-                date_label = tk.Label(row_frame, text=entry[5].split()[0], 
-                                    font=("Courier", 12), bg=bg_color, fg="#d1d0c5",
-                                    width=widths[6])
-                date_label.grid(row=0, column=6, padx=2, pady=3)
+            table.reset(fetch_page)
+        
+        mode_menu.bind("<<ComboboxSelected>>", refresh)
+        window_menu.bind("<<ComboboxSelected>>", refresh)
+        refresh()
         
         # Add close button
         close_button = tk.Button(leaderboard_window, text="Close", font=("Courier", 12),
                                bg="#e2b714", fg="#323437", width=10,
-                               command=leaderboard_window.destroy)
-        close_button.pack(pady=15)
\ No newline at end of file
+                               command=lambda: figure_pool.close_window(leaderboard_window))
+        close_button.pack(pady=15)
+    
+    def format_leaderboard_row(self, position, entry):
+        """Displayed values of a leaderboard row"""
+        username, wpm, accuracy, mode, difficulty, timestamp = entry
+        return (position + 1, username, f"{wpm:.1f}", f"{accuracy or 0:.1f}%",
+                (mode or "").title(), (difficulty or "").title(), (timestamp or "").split(" ")[0])
+    
+    # History table columns: (heading, width, anchor)
+    HISTORY_COLUMNS = [
+        ("Date", 170, "w"),
+        ("Mode", 90, "center"),
+        ("Difficulty", 110, "center"),
+        ("WPM", 70, "e"),
+        ("Accuracy", 90, "e"),
+        ("Errors", 70, "e"),
+        ("Duration", 90, "e")
+    ]
+    
+    def show_history(self, username):
+        """Show a window listing every test of a user, newest first"""
+        history_window = tk.Toplevel()
+        history_window.title(f"Test History - {username}")
+        history_window.geometry("800x600")
+        history_window.configure(bg="#323437")
+        figure_pool.manage_window(history_window)
+        
+        # Title
+        title_label = tk.Label(history_window, text="Test History", 
+                             font=("Courier", 20, "bold"), bg="#323437", fg="#e2b714")
+        title_label.pack(pady=20)
+        
+        count_label = tk.Label(history_window, text="", 
+                             font=("Courier", 12), bg="#323437", fg="#d1d0c5")
+        count_label.pack()
+        
+        def show_count(count):
+            if count_label.winfo_exists():
+                count_label.config(text=f"{count} tests")
+        
+        self.run_query(self.db_manager.count_results, username, callback=show_count)
+        
+        def fetch_page(last_row, limit):
+            after = (last_row[1], last_row[0]) if last_row else None
+            return self.db_manager.get_history_page(username, limit, after)
+        
+        table = PagedTable(history_window, self.HISTORY_COLUMNS, fetch_page, self.format_history_row,
+                           empty_text="No typing test data available.", executor=self.db_executor)
+        table.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
+        table.reset()
+        
+        # Add close button
+        close_button = tk.Button(history_window, text="Close", font=("Courier", 12),
+                               bg="#e2b714", fg="#323437", width=10,
+                               command=lambda: figure_pool.close_window(history_window))
+        close_button.pack(pady=15)
+    
+    def format_history_row(self, position, row):
+        """Displayed values of a history row"""
+        test_id, timestamp, mode, difficulty, wpm, accuracy, errors, duration = row
+        return (timestamp, (mode or "").title(), (difficulty or "").title(), f"{wpm or 0:.1f}",
+                f"{accuracy or 0:.1f}%", errors or 0, f"{duration or 0:.1f}s")
@@ -0,0 +1,83 @@
+import gzip
+import json
+import sqlite3
+import threading
+import urllib.request
+
+from database_manager import SYNC_FIELDS
+
+class SyncClient:
+    """Push locally saved results to a sync server in compressed batches.
+
+    Results with ids past the sync_state watermark are unsynced. A
+    background thread posts them oldest first, batch_size results per
+    request, and moves the watermark past a batch only after the server
+    acknowledges it. Results carry a result_uid, so a batch resent after
+    a lost response is not stored twice.
+    """
+
+    def __init__(self, db_manager, url, batch_size=500, interval=10.0, max_backoff=300.0, timeout=10.0):
+        self.db_manager = db_manager
+        self.url = url.rstrip("/") + "/results"
+        self.batch_size = batch_size
+        self.interval = interval
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.wake = threading.Event()
+        self.stopping = False
+        self.thread = None
+
+    def start(self):
+        """Start syncing in the background"""
+        self.thread = threading.Thread(target=self._sync_loop, name="result-sync", daemon=True)
+        self.thread.start()
+
+    def notify(self):
+        """Sync soon, e.g. after a result was saved"""
+        self.wake.set()
+
+    def stop(self, timeout=5.0):
+        """Stop the background thread"""
+        self.stopping = True
+        self.wake.set()
+        if self.thread:
+            self.thread.join(timeout)
+
+    def sync(self):
+        """Send every queued result, returning how many the server accepted as new"""
+        inserted = 0
+        while not self.stopping:
+            rows = self.db_manager.get_sync_batch(self.batch_size)
+            if not rows:
+                break
+            inserted += self.send([row[1:] for row in rows])
+            self.db_manager.mark_synced(rows[-1][0])
+            if len(rows) < self.batch_size:
+                break
+        return inserted
+
+    def send(self, rows):
+        """Post one batch of SYNC_FIELDS rows and return the server's inserted count"""
+        payload = {"results": [dict(zip(SYNC_FIELDS, row)) for row in rows]}
+        body = gzip.compress(json.dumps(payload, separators=(",", ":")).encode(), compresslevel=6)
+        request = urllib.request.Request(self.url, data=body, method="POST", headers={
+            "Content-Type": "application/json",
+            "Content-Encoding": "gzip"
+        })
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return json.loads(response.read())["inserted"]
+
+    def _sync_loop(self):
+        """Sync thread: sync on start, when notified and every interval, backing off on errors"""
+        delay = self.interval
+        while not self.stopping:
+            try:
+                self.sync()
+                delay = self.interval
+            except (OSError, ValueError, KeyError, sqlite3.Error) as e:
+                # urllib errors are OSErrors; the queue is kept for the next attempt
+                print(f"Result sync failed: {e}")
+                delay = min(delay * 2, self.max_backoff)
+            self.wake.wait(delay)
+            self.wake.clear()
+        self.db_manager.release_connection()
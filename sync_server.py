@@ -0,0 +1,176 @@
+"""Results ingestion service for sharing one leaderboard between installs.
+
+Each install's SyncClient posts gzip-compressed JSON batches of results to
+POST /results; they are stored in the server's own SQLite database, which
+has the same schema as typing_data.db. Request threads only parse; a
+single writer thread imports every batch waiting at that moment in one
+transaction, so concurrent uploads share commits instead of contending
+for the write lock. GET /leaderboard returns the combined leaderboard.
+
+    python sync_server.py --db sync_data.db --port 8765
+"""
+import argparse
+import gzip
+import json
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from database_manager import DatabaseManager, SYNC_FIELDS
+
+# Largest accepted request body, compressed and uncompressed
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+# Most results imported in one transaction
+MAX_COMMIT_ROWS = 20000
+
+# How long a request waits for its batch to be stored (seconds)
+INGEST_TIMEOUT = 30.0
+
+class SyncRequestHandler(BaseHTTPRequestHandler):
+    """Handle ingestion and leaderboard requests"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        if urlparse(self.path).path != "/results":
+            self.send_json(404, {"error": "not found"})
+            return
+        try:
+            results = self.read_json()["results"]
+            rows = [tuple(result.get(field) for field in SYNC_FIELDS) for result in results]
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            self.send_json(400, {"error": f"invalid batch: {e}"})
+            return
+        if any(not row[0] for row in rows):
+            self.send_json(400, {"error": "every result needs a result_uid"})
+            return
+
+        try:
+            inserted = self.server.ingest(rows).result(INGEST_TIMEOUT)
+        except sqlite3.Error as e:
+            # The client keeps the batch queued and retries later
+            self.send_json(503, {"error": f"database error: {e}"})
+            return
+        self.send_json(200, {"received": len(rows), "inserted": inserted})
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/health":
+            self.send_json(200, {"status": "ok"})
+        elif url.path == "/leaderboard":
+            query = parse_qs(url.query)
+            try:
+                limit = min(int(query.get("limit", ["100"])[0]), 1000)
+                rows = self.server.db_manager.get_leaderboard_page(
+                    limit, mode=query.get("mode", [None])[0], window=query.get("window", ["all"])[0]
+                )
+            except (ValueError, KeyError) as e:
+                self.send_json(400, {"error": f"invalid query: {e}"})
+                return
+            keys = ("username", "wpm", "accuracy", "test_mode", "difficulty", "timestamp")
+            self.send_json(200, {"leaderboard": [dict(zip(keys, row)) for row in rows]})
+        else:
+            self.send_json(404, {"error": "not found"})
+
+    def read_json(self):
+        """Read the request body, decompressing gzip bodies"""
+        length = int(self.headers.get("Content-Length", 0))
+        if length > MAX_BODY_BYTES:
+            raise ValueError("body too large")
+        body = self.rfile.read(length)
+        if self.headers.get("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+            if len(body) > MAX_BODY_BYTES:
+                raise ValueError("body too large")
+        return json.loads(body)
+
+    def send_json(self, status, payload):
+        """Send a JSON response"""
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+class SyncServer(ThreadingHTTPServer):
+    """HTTP server that stores posted results through a DatabaseManager"""
+
+    daemon_threads = True
+
+    def __init__(self, address, db_file, quiet=False):
+        self.db_manager = DatabaseManager(db_file)
+        self.db_manager.setup_database()
+        self.quiet = quiet
+        self.pending = queue.Queue()
+        self.writer_thread = threading.Thread(target=self._writer_loop, name="sync-writer", daemon=True)
+        self.writer_thread.start()
+        super().__init__(address, SyncRequestHandler)
+
+    def ingest(self, rows):
+        """Queue a batch for the writer; the Future gives its count of new results"""
+        future = Future()
+        self.pending.put((rows, future))
+        return future
+
+    def _writer_loop(self):
+        """Writer thread: import all waiting batches together"""
+        while True:
+            item = self.pending.get()
+            if item is None:
+                break
+            group = [item]
+            size = len(item[0])
+            while size < MAX_COMMIT_ROWS:
+                try:
+                    item = self.pending.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self.pending.put(None)
+                    break
+                group.append(item)
+                size += len(item[0])
+
+            try:
+                counts = self.db_manager.import_results([rows for rows, future in group])
+            except sqlite3.Error as e:
+                for rows, future in group:
+                    future.set_exception(e)
+                continue
+            for (rows, future), count in zip(group, counts):
+                future.set_result(count)
+
+    def server_close(self):
+        super().server_close()
+        self.pending.put(None)
+        self.writer_thread.join()
+        self.db_manager.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the TypeMaster results sync server")
+    parser.add_argument("--db", default="sync_data.db", help="server database file (default: sync_data.db)")
+    parser.add_argument("--host", default="0.0.0.0", help="address to listen on")
+    parser.add_argument("--port", type=int, default=8765, help="port to listen on")
+    parser.add_argument("--quiet", action="store_true", help="don't log requests")
+    args = parser.parse_args()
+
+    server = SyncServer((args.host, args.port), args.db, quiet=args.quiet)
+    print(f"Listening on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
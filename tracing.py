@@ -0,0 +1,157 @@
+"""Opt-in tracing of the app's hot paths, exported as Chrome trace events.
+
+Set TYPEMASTER_TRACE to an output path (e.g. trace.json) to enable it.
+install() then wraps the methods listed in HOOKS with timing wrappers;
+without the variable nothing is wrapped, so disabled tracing costs
+nothing. Spans go into a bounded ring buffer and are written on exit in
+the trace-event format read by chrome://tracing and Perfetto.
+"""
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import types
+from collections import deque
+from contextlib import contextmanager
+
+TRACE_ENV = "TYPEMASTER_TRACE"
+BUFFER_ENV = "TYPEMASTER_TRACE_BUFFER"
+
+# Code flag of generator functions (inspect is slow to import at startup)
+CO_GENERATOR = 0x20
+
+# module -> (class, methods to trace or None for every method, category)
+HOOKS = {
+    "typing_test": ("TypingTest", ("on_key_press", "check_input", "update_stats", "update_timer"), "input"),
+    "database_manager": ("DatabaseManager", None, "db"),
+    "sound_manager": ("SoundManager", ("play_sound",), "sound"),
+    "stats_visualizer": ("StatsVisualizer", ("create_wpm_graph", "create_progress_graph",
+                                             "create_stats_summary", "fill_progress_window",
+                                             "show_leaderboard", "show_history"), "charts"),
+}
+
+class Tracer:
+    """Ring buffer of completed spans: (name, category, start_ns, duration_ns, thread id)"""
+
+    def __init__(self, capacity=100000):
+        self.spans = deque(maxlen=capacity)
+        self.thread_names = {}
+        self.enabled = False
+        self.output_path = None
+        self.origin = time.perf_counter_ns()
+
+    def record(self, name, category, start, duration):
+        """Add a finished span; deque appends are thread-safe"""
+        tid = threading.get_ident()
+        if tid not in self.thread_names:
+            # Kept here, the thread may have exited by export time
+            self.thread_names[tid] = threading.current_thread().name
+        self.spans.append((name, category, start, duration, tid))
+
+    @contextmanager
+    def span(self, name, category="app"):
+        """Time a block of code"""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.record(name, category, start, time.perf_counter_ns() - start)
+
+    def chrome_events(self):
+        """The buffered spans as Chrome trace events"""
+        pid = os.getpid()
+        events = []
+        threads = set()
+        for name, category, start, duration, tid in list(self.spans):
+            threads.add(tid)
+            events.append({
+                "name": name, "cat": category, "ph": "X", "pid": pid, "tid": tid,
+                "ts": (start - self.origin) / 1000.0, "dur": duration / 1000.0
+            })
+        for tid in threads:
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid,
+                           "args": {"name": self.thread_names.get(tid, f"thread-{tid}")}})
+        return events
+
+    def export(self, path=None):
+        """Write the buffered spans to a trace file and return its path"""
+        path = path or self.output_path
+        with open(path, "w") as file:
+            json.dump({"traceEvents": self.chrome_events(), "displayTimeUnit": "ms"}, file)
+        return path
+
+tracer = Tracer()
+
+def is_generator(func):
+    """Whether func is a generator function"""
+    return bool(func.__code__.co_flags & CO_GENERATOR)
+
+def traced(func, name, category):
+    """Wrap a function so every call is recorded as a span"""
+    record = tracer.record
+    perf_counter_ns = time.perf_counter_ns
+
+    # contextmanager functions: time the with block, not just creating the manager
+    wrapped = getattr(func, "__wrapped__", None)
+    if isinstance(wrapped, types.FunctionType) and is_generator(wrapped):
+        @contextmanager
+        @functools.wraps(func)
+        def context_wrapper(*args, **kwargs):
+            start = perf_counter_ns()
+            try:
+                with func(*args, **kwargs) as value:
+                    yield value
+            finally:
+                record(name, category, start, perf_counter_ns() - start)
+        context_wrapper.__traced__ = True
+        return context_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = perf_counter_ns()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            record(name, category, start, perf_counter_ns() - start)
+    wrapper.__traced__ = True
+    return wrapper
+
+def instrument(cls, methods=None, category="app"):
+    """Replace methods of cls (all plain methods by default) with traced ones"""
+    if methods is None:
+        methods = [name for name, value in vars(cls).items()
+                   if isinstance(value, types.FunctionType) and not name.startswith("__")
+                   # Generators would be timed only until their first item
+                   and not is_generator(value)]
+    for method in methods:
+        func = vars(cls).get(method)
+        if func is None or getattr(func, "__traced__", False):
+            continue
+        setattr(cls, method, traced(func, f"{cls.__name__}.{method}", category))
+
+def install():
+    """Enable tracing if TYPEMASTER_TRACE is set and instrument the loaded hook modules.
+
+    Safe to call again after importing a module lazily; classes are only
+    wrapped once.
+    """
+    if not tracer.enabled:
+        path = os.environ.get(TRACE_ENV)
+        if not path:
+            return False
+        tracer.enabled = True
+        tracer.output_path = path
+        capacity = int(os.environ.get(BUFFER_ENV, 0) or 0)
+        if capacity:
+            tracer.spans = deque(maxlen=capacity)
+
+    for module_name, (class_name, methods, category) in HOOKS.items():
+        module = sys.modules.get(module_name)
+        if module is not None:
+            instrument(getattr(module, class_name), methods, category)
+    return True
@@ -0,0 +1,205 @@
+import os
+
+def common_prefix_length(old, new):
+    """Return the length of the shared prefix of two strings"""
+    # Typing and backspacing only touch the end of the input, so try the
+    # cheap prefix checks before falling back to a full comparison
+    if new.startswith(old):
+        return len(old)
+    if old.startswith(new):
+        return len(new)
+    return len(os.path.commonprefix([old, new]))
+
+class TypingSession:
+    """Headless typing test state driven by timestamped keystroke events.
+
+    The session has no tkinter dependency so it can be driven by the UI,
+    by simulated typists or by benchmarks. Apart from a copy of the typed
+    string, every event is O(1).
+
+    For streamed tests trim() drops text typed long ago, so only a window
+    of the reference and typed text is kept. offset is the number of
+    characters dropped; they stay counted in the character counters and
+    position, but can no longer be backspaced.
+    """
+
+    def __init__(self, reference_text, sample_interval=1.0):
+        """Initialize a session for the given reference text"""
+        self.reference_text = reference_text
+        self.sample_interval = sample_interval
+
+        # Typed characters and whether each one matched the reference
+        self.typed = []
+        self.matches = []
+        # The same as a string; joining the list for every event is O(n) Python work
+        self.text = ""
+        # Characters trimmed from the front of the reference and typed text
+        self.offset = 0
+        # Last trimmed typed character, to tell whether the next one starts a word
+        self.trimmed_char = ""
+
+        # Character counters
+        self.correct_chars = 0      # Correct characters currently in the input
+        self.incorrect_chars = 0    # Wrong characters currently in the input
+        self.errors = 0             # Wrong keystrokes, including corrected ones
+        self.corrected_chars = 0    # Wrong characters that were backspaced away
+        self.keystrokes = 0
+
+        # Number of words (runs of non-space characters) in the input
+        self.words_typed = 0
+
+        # Timing
+        self.start_time = None
+        self.last_event_time = None
+        self.last_sample_time = None
+        self.wpm_over_time = []
+
+    @property
+    def position(self):
+        """Index of the next character to be typed"""
+        return self.offset + len(self.typed)
+
+    @property
+    def total_chars(self):
+        """Number of characters currently in the input, trimmed ones included"""
+        return self.offset + len(self.typed)
+
+    @property
+    def typed_text(self):
+        """Current input as a string, without the trimmed characters"""
+        return self.text
+
+    @property
+    def is_complete(self):
+        """True once the whole reference text has been typed"""
+        return len(self.typed) >= len(self.reference_text)
+
+    @property
+    def accuracy(self):
+        """Percentage of characters in the input that are correct"""
+        if not self.total_chars:
+            return 100.0
+        return (self.correct_chars / self.total_chars) * 100.0
+
+    def extend_text(self, text):
+        """Append more reference text to the session"""
+        self.reference_text += text
+
+    def trim(self, offset):
+        """Drop the reference and typed text before offset, which must not be past position"""
+        count = offset - self.offset
+        if count <= 0:
+            return
+        if count > len(self.typed):
+            raise ValueError("Cannot trim text that has not been typed")
+        self.trimmed_char = self.typed[count - 1]
+        del self.typed[:count]
+        del self.matches[:count]
+        self.text = self.text[count:]
+        self.reference_text = self.reference_text[count:]
+        self.offset = offset
+
+    def last_char(self):
+        """Last typed character, trimmed or not, or "" at the start"""
+        return self.typed[-1] if self.typed else self.trimmed_char
+
+    def elapsed(self, now=None):
+        """Seconds elapsed since the first keystroke"""
+        if self.start_time is None:
+            return 0.0
+        if now is None:
+            now = self.last_event_time
+        return max(now - self.start_time, 0.0)
+
+    def live_wpm(self, now=None):
+        """Words typed per minute so far"""
+        minutes = self.elapsed(now) / 60.0
+        return self.words_typed / minutes if minutes > 0 else 0
+
+    def gross_wpm(self, now=None):
+        """Standard WPM, counting five typed characters as one word"""
+        minutes = self.elapsed(now) / 60.0
+        return (self.total_chars / 5) / minutes if minutes > 0 else 0
+
+    def _record_event(self, timestamp):
+        """Update timing state for an incoming event"""
+        if self.start_time is None:
+            self.start_time = timestamp
+            self.last_sample_time = timestamp
+        self.last_event_time = timestamp
+        self.keystrokes += 1
+
+        # Record WPM over time (every sample interval)
+        if timestamp - self.last_sample_time >= self.sample_interval:
+            self.wpm_over_time.append(self.live_wpm(timestamp))
+            self.last_sample_time = timestamp
+
+    def type_char(self, char, timestamp):
+        """Process a typed character, returning True if it was correct"""
+        self._record_event(timestamp)
+
+        index = len(self.typed)
+        is_correct = index < len(self.reference_text) and self.reference_text[index] == char
+        if is_correct:
+            self.correct_chars += 1
+        else:
+            self.incorrect_chars += 1
+            self.errors += 1
+
+        # A non-space character after a space (or at the start) begins a word
+        if not char.isspace() and (not self.last_char() or self.last_char().isspace()):
+            self.words_typed += 1
+
+        self.typed.append(char)
+        self.matches.append(is_correct)
+        self.text += char
+        return is_correct
+
+    def backspace(self, timestamp):
+        """Process a backspace, returning the removed character if any"""
+        self._record_event(timestamp)
+        if not self.typed:
+            return None
+
+        char = self.typed.pop()
+        self.text = self.text[:-1]
+        if self.matches.pop():
+            self.correct_chars -= 1
+        else:
+            self.incorrect_chars -= 1
+            self.corrected_chars += 1
+
+        if not char.isspace() and (not self.last_char() or self.last_char().isspace()):
+            self.words_typed -= 1
+        return char
+
+    def apply_input(self, text, timestamp):
+        """Bring the session in line with an arbitrary input string.
+
+        Used for edits that are not plain keystrokes (pasting, deleting a
+        selection, moving the cursor). text excludes trimmed characters,
+        like typed_text. Returns the index in it of the first character
+        that changed.
+        """
+        current = self.typed_text
+        if current == text:
+            return len(text)
+
+        start = common_prefix_length(current, text)
+        while len(self.typed) > start:
+            self.backspace(timestamp)
+        for char in text[start:]:
+            self.type_char(char, timestamp)
+        return start
+
+    def results(self, now=None):
+        """Summary of the session in the format used for saving results"""
+        return {
+            "wpm": self.gross_wpm(now),
+            "accuracy": self.accuracy,
+            "errors": self.errors,
+            "correct_chars": self.correct_chars,
+            "total_chars": self.total_chars,
+            "test_duration": self.elapsed(now),
+            "wpm_over_time": self.wpm_over_time
+        }
@@ -1,11 +1,96 @@
 import tkinter as tk
 from tkinter import ttk
 import time
-import random
 import threading
 import sound_manager
+from live_chart import LiveChart
+from latency_monitor import LatencyMonitor, LatencyOverlay
+from typing_session import TypingSession, common_prefix_length
+
+class IncrementalHighlighter:
+    """Keep the correct/error tags of a Text widget in sync with typed input.
+
+    Offsets are positions in the reference text. Streamed text can be
+    appended and text typed long ago trimmed, so only the reference and
+    typed text from the trim offset on are kept, and trimmed characters
+    are subtracted when converting to widget indices.
+    """
+
+    def __init__(self, text_widget):
+        self.text_widget = text_widget
+        self.reference = ""
+        self.rendered = ""
+        self.trimmed = 0
+
+    def reset(self, reference):
+        """Start highlighting against a new reference text"""
+        self.text_widget.tag_remove("correct", "1.0", tk.END)
+        self.text_widget.tag_remove("error", "1.0", tk.END)
+        self.reference = reference
+        self.rendered = ""
+        self.trimmed = 0
+
+    def index(self, offset):
+        """Convert a character offset into a Text widget index"""
+        return f"1.0 + {max(offset - self.trimmed, 0)} chars"
+
+    def append(self, text):
+        """Add streamed reference text to the end of the widget"""
+        self.reference += text
+        self.text_widget.config(state="normal")
+        self.text_widget.insert(tk.END, text)
+        self.text_widget.config(state="disabled")
+
+    def trim(self, offset):
+        """Remove the reference text before offset from the widget"""
+        if offset <= self.trimmed:
+            return
+        self.text_widget.config(state="normal")
+        self.text_widget.delete("1.0", self.index(offset))
+        self.text_widget.config(state="disabled")
+        count = offset - self.trimmed
+        self.reference = self.reference[count:]
+        self.rendered = self.rendered[count:]
+        self.trimmed = offset
+
+    def update(self, typed):
+        """Retag the span that changed since the previous call.
+
+        typed is the input from the trim offset on, like TypingSession.typed_text.
+        """
+        rendered = self.rendered
+        start = common_prefix_length(rendered, typed)
+        if start == len(rendered) and start == len(typed):
+            return
+
+        # Drop the tags of everything after the shared prefix
+        base = self.trimmed
+        if start < len(rendered):
+            self.text_widget.tag_remove("correct", self.index(base + start), self.index(base + len(rendered)))
+            self.text_widget.tag_remove("error", self.index(base + start), self.index(base + len(rendered)))
+
+        # Tag the new characters, merging runs of the same state into one range
+        reference = self.reference
+        limit = min(len(typed), len(reference))
+        i = start
+        while i < limit:
+            is_correct = typed[i] == reference[i]
+            j = i + 1
+            while j < limit and (typed[j] == reference[j]) == is_correct:
+                j += 1
+            self.text_widget.tag_add("correct" if is_correct else "error",
+                                     self.index(base + i), self.index(base + j))
+            i = j
+
+        self.rendered = typed
 
 class TypingTest:
+    # Streamed text (time and endless modes): words per chunk, untyped
+    # characters to keep ahead of the typist, typed characters to keep visible
+    STREAM_CHUNK_WORDS = 30
+    STREAM_LOOKAHEAD = 400
+    DISPLAY_KEEP_BEHIND = 200
+
     def __init__(self, parent_frame, parent_app, mode, value, difficulty, sound_manager, custom_text=None):
         """Initialize typing test interface"""
         self.parent_frame = parent_frame
@@ -15,18 +100,14 @@ class TypingTest:
         self.difficulty = difficulty
         self.sound_manager = sound_manager
         self.custom_text = custom_text
+        self.keystroke_logger = parent_app.keystroke_logger
         
         # Test state variables
         self.test_text = ""
-        self.current_position = 0
-        self.test_start_time = 0
+        self.text_stream = None
+        self.session = TypingSession(self.test_text)
         self.test_active = False
         self.test_completed = False
-        self.wpm_over_time = []  # For tracking WPM changes during the test
-        self.last_update_time = 0
-        self.correct_chars = 0
-        self.total_chars = 0
-        self.errors = 0
         
         # Timer for time-based tests
         self.remaining_time = 0
@@ -50,6 +131,8 @@ class TypingTest:
             mode_text += f" - {self.value}s"
         elif self.mode == "words":
             mode_text += f" - {self.value} words"
+        elif self.mode == "endless":
+            mode_text += " - Esc to finish"
         
         self.mode_label = tk.Label(left_info, text=mode_text, 
                                  font=("Courier", 12), bg="#323437", fg="#d1d0c5")
@@ -63,6 +146,10 @@ class TypingTest:
             self.words_label = tk.Label(left_info, text=f"Words: 0/{self.value}", 
                                       font=("Courier", 12), bg="#323437", fg="#d1d0c5")
             self.words_label.pack(anchor='w')
+        elif self.mode == "endless":
+            self.words_label = tk.Label(left_info, text="Words: 0", 
+                                      font=("Courier", 12), bg="#323437", fg="#d1d0c5")
+            self.words_label.pack(anchor='w')
         
         # Right info (Stats)
         right_info = tk.Frame(self.info_frame, bg="#323437")
@@ -76,6 +163,20 @@ class TypingTest:
                                      font=("Courier", 12), bg="#323437", fg="#d1d0c5")
         self.accuracy_label.pack(anchor='e')
         
+        # Optional live WPM/accuracy chart, sampled at a fixed rate during the test
+        self.live_chart = None
+        if self.parent_app.settings_manager.settings["live_chart"]:
+            self.live_chart = LiveChart(self.parent_frame, self.sample_live_stats)
+            self.live_chart.pack(fill=tk.X, padx=20)
+        
+        # Key-to-paint latency and event-loop lag, saved with the results
+        self.latency_monitor = LatencyMonitor(self.parent_frame)
+        self.check_scheduled = False
+        self.latency_overlay = None
+        if self.parent_app.settings_manager.settings["latency_overlay"]:
+            self.latency_overlay = LatencyOverlay(self.parent_frame, self.latency_monitor)
+            self.latency_overlay.pack(fill=tk.X, padx=20)
+        
         # Text display frame
         self.text_frame = tk.Frame(self.parent_frame, bg="#323437")
         self.text_frame.pack(fill=tk.BOTH, expand=True, pady=20)
@@ -90,6 +191,7 @@ class TypingTest:
         # Configure tags for text coloring
         self.text_display.tag_configure("correct", foreground="#a3be8c")
         self.text_display.tag_configure("error", foreground="#bf616a", background="#802020")
+        self.highlighter = IncrementalHighlighter(self.text_display)
         
         # Input frame
         self.input_frame = tk.Frame(self.parent_frame, bg="#323437")
@@ -121,34 +223,23 @@ class TypingTest:
         if self.custom_text:
             return self.custom_text
         
-        if self.mode == "words" or self.mode == "time":
-            db_manager = self.parent_app.db_manager
-            words = db_manager.get_words(self.difficulty)
-            
-            if not words:
-                # Fallback word list if database is empty
-                words = ["the", "be", "to", "of", "and", "a", "in", "that", "have", "I", 
-                       "it", "for", "not", "on", "with", "he", "as", "you", "do", "at"]
+        if self.mode in ("words", "time", "endless"):
+            word_corpus = self.parent_app.db_manager.word_corpus
             
             # For word mode, select exactly the specified number of words
             if self.mode == "words":
-                selected_words = random.sample(words, min(self.value, len(words)))
-                if len(selected_words) < self.value:
-                    # If we don't have enough unique words, repeat some
-                    remaining = self.value - len(selected_words)
-                    selected_words.extend(random.choices(words, k=remaining))
-                return " ".join(selected_words)
+                return word_corpus.words_text(self.difficulty, self.value)
             
-            # For time mode, generate more text than needed
-            elif self.mode == "time":
-                # Generate more words for longer tests
-                word_count = min(self.value * 5, len(words) * 3)  # Approx. 1 word per second × 5
-                selected_words = random.choices(words, k=word_count)
-                return " ".join(selected_words)
+            # For time and endless mode, stream words as the typist gets close to the end
+            self.text_stream = word_corpus.stream(self.difficulty, self.STREAM_CHUNK_WORDS)
+            text = ""
+            while len(text) < self.STREAM_LOOKAHEAD:
+                text += next(self.text_stream)
+            return text
         
         elif self.mode == "paragraph":
             db_manager = self.parent_app.db_manager
-            return db_manager.get_paragraph(self.difficulty)
+            return db_manager.get_paragraph(self.difficulty, self.parent_app.current_user or "guest")
         
         # Default fallback text
         return "The quick brown fox jumps over the lazy dog."
@@ -156,6 +247,7 @@ class TypingTest:
     def start(self):
         """Start the typing test"""
         # Generate test text
+        self.text_stream = None
         self.test_text = self.generate_test_text()
         
         # Display text
@@ -163,14 +255,12 @@ class TypingTest:
         self.text_display.delete("1.0", tk.END)
         self.text_display.insert(tk.END, self.test_text)
         self.text_display.config(state="disabled")
+        self.highlighter.reset(self.test_text)
         
         # Reset state variables
-        self.current_position = 0
+        self.session = TypingSession(self.test_text)
+        self.keystroke_logger.discard()
         self.test_completed = False
-        self.correct_chars = 0
-        self.total_chars = 0
-        self.errors = 0
-        self.wpm_over_time = []
         
         # If time mode, initialize the countdown
         if self.mode == "time":
@@ -182,119 +272,149 @@ class TypingTest:
         # Ignore special keys and modified keys
         if event.keysym in ["Shift_L", "Shift_R", "Control_L", "Control_R", "Alt_L", "Alt_R"]:
             return
+        if self.test_completed:
+            return
+        
+        timestamp = time.perf_counter()
         
         # Start test on first keypress
         if not self.test_active:
             self.test_active = True
-            self.test_start_time = time.time()
-            self.last_update_time = self.test_start_time
             
             if self.mode == "time":
                 self.timer_active = True
                 self.update_timer()
                 self.start_label.config(text="Test in progress...")
+            
+            if self.live_chart:
+                self.live_chart.start()
+            
+            self.latency_monitor.start()
+            if self.latency_overlay:
+                self.latency_overlay.start()
+        
+        # Feed plain keystrokes to the session; other edits are reconciled in check_input.
+        # Backspace never gets here, on_backspace handles it
+        is_correct = None
+        position = self.session.position
+        if event.char and event.char.isprintable() and not event.state & 0x4:
+            is_correct = self.session.type_char(event.char, timestamp)
+        if position != self.session.position:
+            self.latency_monitor.key_pressed(timestamp)
+        
+        # Buffer the raw event; it is written in the background after the test
+        self.keystroke_logger.record(event.keysym, event.char, timestamp, position, is_correct)
+        
+        # Retag as soon as the Entry has applied the key, not on key release
+        self.schedule_check()
         
         # Play key sound if enabled
-        self.sound_manager.play_key_sound()
-    
-    def on_space(self, event):
-        """Handle space bar press - just for tracking word count"""
-        if self.test_active and not self.test_completed:
-            # Check if test is complete (for word mode)
-            if self.mode == "words":
-                current_text = self.input_field.get()
-                word_count = len(current_text.split())
-                if word_count >= self.value:
-                    self.complete_test()
-            return "break"  # Allow the space to be added to input
+        if is_correct is False:
+            self.sound_manager.play_error_sound()
+        else:
+            self.sound_manager.play_key_sound()
     
     def on_backspace(self, event):
-        """Handle backspace key"""
+        """Handle backspace key (the <BackSpace> binding takes precedence over <Key>)"""
         if self.test_active and not self.test_completed:
-            # Just update the display, stats are updated in check_input
+            timestamp = time.perf_counter()
+            position = self.session.position
+            
+            # Update the session and log the correction like any other key;
+            # deleting a selection is reconciled in check_input
+            self.session.backspace(timestamp)
+            self.keystroke_logger.record(event.keysym, event.char, timestamp, position)
+            
+            # Stats and the display are updated in check_input
+            self.latency_monitor.key_pressed(timestamp)
+            self.schedule_check()
             return  # Allow normal backspace behavior
 
+    def schedule_check(self):
+        """Run check_input on the next idle pass, after the Entry's own key binding"""
+        if not self.check_scheduled:
+            self.check_scheduled = True
+            self.input_field.after_idle(self.run_scheduled_check)
+
+    def run_scheduled_check(self):
+        """Idle callback of schedule_check"""
+        self.check_scheduled = False
+        if self.input_field.winfo_exists():
+            self.check_input()
+
     def check_input(self, event=None):
         """Update display based on current input and calculate accuracy"""
         if self.test_active and not self.test_completed:
             current_text = self.input_field.get()
 
-            # Enable text modification in UI
-            self.text_display.config(state="normal")
-            self.text_display.delete("1.0", tk.END)
-            self.text_display.insert(tk.END, self.test_text)
-
-            # Reset character counters
-            self.correct_chars = 0
-            self.total_chars = len(current_text)  # Track total typed characters
+            # Catch up with edits that were not plain keystrokes (paste, selection, cursor moves)
+            self.session.apply_input(current_text, time.perf_counter())
 
-            # Apply character-by-character highlighting
-            for i, char in enumerate(current_text):
-                if i < len(self.test_text):
-                    expected_char = self.test_text[i]
-                    if char == expected_char:
-                        self.correct_chars += 1  # Correct character
-                        self.text_display.tag_add("correct", f"1.{i}", f"1.{i+1}")
-                    else:
-                        self.text_display.tag_add("error", f"1.{i}", f"1.{i+1}")
+            # Retag only the span that changed since the last keystroke
+            self.highlighter.update(current_text)
+            if self.text_stream is not None:
+                self.advance_stream()
 
             # Update accuracy and WPM
             self.update_stats()
+            self.latency_monitor.retagged()
 
-            # Disable text modification after updating UI
-            self.text_display.config(state="disabled")
+            # Word, paragraph and custom tests end once the whole text is typed
+            if self.mode not in ("time", "endless") and self.session.is_complete:
+                self.complete_test()
+
+    def advance_stream(self):
+        """Keep streamed text ahead of the typist and drop text typed long ago.
+
+        Only a window of the text is kept anywhere: the session, the
+        highlighter, the text display and the input field are all trimmed
+        together, so memory and per-key work stay flat however long the
+        test runs. test_text keeps only the text the test started with.
+        """
+        session = self.session
+        position = session.position
+        while session.offset + len(session.reference_text) - position < self.STREAM_LOOKAHEAD:
+            chunk = next(self.text_stream)
+            session.extend_text(chunk)
+            self.highlighter.append(chunk)
+
+        # Trim whole words once enough typed text has built up
+        keep_from = position - self.DISPLAY_KEEP_BEHIND
+        if keep_from - session.offset >= self.DISPLAY_KEEP_BEHIND:
+            count = session.reference_text.rfind(" ", 0, keep_from - session.offset) + 1
+            if count:
+                offset = session.offset + count
+                session.trim(offset)
+                self.highlighter.trim(offset)
+                self.input_field.delete(0, count)
+        self.text_display.see(self.highlighter.index(position))
+
+    def sample_live_stats(self, now):
+        """Current WPM and accuracy for the live chart"""
+        return self.session.live_wpm(now), self.session.accuracy
 
-    
-    def calculate_stats(self, current_text):
-        """Calculate stats based on current input"""
-        # Reset counters
-        self.correct_chars = 0
-        self.errors = 0
-        self.total_chars = len(current_text)
-        
-        # Count correct characters and errors
-        for i, char in enumerate(current_text):
-            if i < len(self.test_text):
-                if char == self.test_text[i]:
-                    self.correct_chars += 1
-                else:
-                    self.errors += 1
-        
-        # Play error sound if needed
-        if self.errors > 0:
-            self.sound_manager.play_error_sound()
-        
-        # Update stats display
-        self.update_stats()
-    
     def update_stats(self):
         """Update WPM and accuracy statistics"""
         if not self.test_active or self.test_completed:
             return
 
-        # Calculate elapsed time in minutes
-        current_time = time.time()
-        elapsed_time = (current_time - self.test_start_time) / 60.0  # Convert to minutes
-
-        # WPM Calculation: Count correct words typed
-        words_typed = len(self.input_field.get().split())  # Count words typed
-        wpm = words_typed / elapsed_time if elapsed_time > 0 else 0
-
-        # Accuracy Calculation: Correct characters / Total characters
-        accuracy = 100.0
-        if self.total_chars > 0:
-            accuracy = (self.correct_chars / self.total_chars) * 100.0
+        now = time.perf_counter()
 
         # Update UI labels
-        self.wpm_label.config(text=f"WPM: {wpm:.1f}")
-        self.accuracy_label.config(text=f"Accuracy: {accuracy:.1f}%")
-
-        # Record WPM over time (every second)
-        if current_time - self.last_update_time >= 1.0:
-            self.wpm_over_time.append(wpm)
-            self.last_update_time = current_time
+        self.wpm_label.config(text=f"WPM: {self.session.live_wpm(now):.1f}")
+        self.accuracy_label.config(text=f"Accuracy: {self.session.accuracy:.1f}%")
+        if self.mode == "words":
+            self.words_label.config(text=f"Words: {self.session.words_typed}/{self.value}")
+        elif self.mode == "endless":
+            self.words_label.config(text=f"Words: {self.session.words_typed}")
 
     
+    def stop_latency_monitor(self):
+        """Stop the latency probe and overlay"""
+        self.latency_monitor.stop()
+        if self.latency_overlay:
+            self.latency_overlay.stop()
+    
     def update_timer(self):
         """Update timer for time-based tests"""
         if self.timer_active and self.remaining_time > 0:
@@ -318,43 +438,34 @@ class TypingTest:
         self.test_completed = True
         self.test_active = False
         self.timer_active = False
+        if self.live_chart:
+            self.live_chart.stop()
+        self.stop_latency_monitor()
         
         # Calculate final stats
-        test_end_time = time.time()
-        test_duration = test_end_time - self.test_start_time
-        
-        # Calculate WPM
-        if test_duration > 0:
-            wpm = (self.total_chars / 5) / (test_duration / 60.0)
-        else:
-            wpm = 0
-        
-        # Calculate accuracy
-        accuracy = 100.0
-        if self.total_chars > 0:
-            accuracy = (self.correct_chars / self.total_chars) * 100.0
-        
-        # Save results
         results = {
             "mode": self.mode,
             "value": self.value,
-            "difficulty": self.difficulty,
-            "wpm": wpm,
-            "accuracy": accuracy,
-            "errors": self.errors,
-            "correct_chars": self.correct_chars,
-            "total_chars": self.total_chars,
-            "test_duration": test_duration,
-            "wpm_over_time": self.wpm_over_time
+            "difficulty": self.difficulty
         }
+        results.update(self.session.results(time.perf_counter()))
+        results["latency"] = self.latency_monitor.summary()
         
         # Pass results to parent app
         self.parent_app.save_results(results)
     
     def cancel_test(self, event=None):
         """Cancel the current test"""
+        # Endless tests have no end, so Escape finishes them and saves the results
+        if self.mode == "endless" and self.test_active and not self.test_completed:
+            self.complete_test()
+            return "break"
         if self.test_active:
             self.test_active = False
             self.timer_active = False
+            if self.live_chart:
+                self.live_chart.stop()
+            self.stop_latency_monitor()
+            self.keystroke_logger.discard()
             self.parent_app.show_welcome_screen()
         return "break"  # Prevent default behavior
\ No newline at end of file
@@ -0,0 +1,293 @@
+"""Synthetic typists for exercising TypingTest without a keyboard.
+
+A TypistProfile describes speed, mistakes and timing; generate_keystrokes
+turns a reference text into timestamped key events. The events can be
+replayed headless into TypingSession and IncrementalHighlighter (the work
+done by TypingTest's key handlers) or into a running app's widgets with
+event_generate. Both report per-keystroke handler latency percentiles.
+
+    python typist_simulator.py --wpm 90 --chars 20000
+    python typist_simulator.py --tk --speedup 20 --wpm 120 --chars 2000
+"""
+import argparse
+import json
+import math
+import random
+import time
+from collections import Counter
+
+from corpus import FALLBACK_WORDS
+from typing_session import TypingSession
+
+# Keys next to each other on a QWERTY keyboard, used for realistic typos
+KEYBOARD_ROWS = ("qwertyuiop", "asdfghjkl", "zxcvbnm")
+
+# Keysyms of the punctuation found in test texts
+KEYSYMS = {
+    " ": "space", ".": "period", ",": "comma", "'": "apostrophe", '"': "quotedbl",
+    "-": "minus", "!": "exclam", "?": "question", ";": "semicolon", ":": "colon",
+    "(": "parenleft", ")": "parenright"
+}
+
+def keyboard_neighbours():
+    """Map each letter to the letters around it"""
+    neighbours = {}
+    for row_index, row in enumerate(KEYBOARD_ROWS):
+        for col, letter in enumerate(row):
+            near = set(row[max(col - 1, 0):col + 2])
+            for other in (row_index - 1, row_index + 1):
+                if 0 <= other < len(KEYBOARD_ROWS):
+                    near.update(KEYBOARD_ROWS[other][max(col - 1, 0):col + 1])
+            near.discard(letter)
+            neighbours[letter] = "".join(sorted(near))
+    return neighbours
+
+NEIGHBOURS = keyboard_neighbours()
+
+class TypistProfile:
+    """How a simulated typist types.
+
+    Intervals between keys average 12 / wpm seconds (five characters per
+    word, spaces word_pause times slower than letters) and follow the
+    timing distribution, "lognormal", "gamma" or "constant", with jitter
+    as the coefficient of variation.
+    Each key is mistyped with probability error_rate; a mistake is noticed
+    with probability correction_rate, up to max_overrun keys later, and
+    backspaced away after a correction_delay pause.
+    """
+
+    TIMINGS = ("lognormal", "gamma", "constant")
+
+    def __init__(self, wpm=60, error_rate=0.03, correction_rate=0.9, timing="lognormal",
+                 jitter=0.4, word_pause=1.3, max_overrun=2, correction_delay=0.3,
+                 backspace_speed=1.5):
+        if timing not in self.TIMINGS:
+            raise ValueError(f"Unknown timing distribution: {timing}")
+        self.wpm = wpm
+        self.error_rate = error_rate
+        self.correction_rate = correction_rate
+        self.timing = timing
+        self.jitter = jitter
+        self.word_pause = word_pause
+        self.max_overrun = max_overrun
+        self.correction_delay = correction_delay
+        self.backspace_speed = backspace_speed
+
+    def interval(self, rng, scale=1.0):
+        """Draw the time before the next key"""
+        # Spaces (about one key in five) are slower, the other keys faster to match
+        mean = 12.0 / self.wpm * scale / (1.0 + (self.word_pause - 1.0) / 5.0)
+        if self.timing == "constant" or self.jitter <= 0:
+            return mean
+        if self.timing == "gamma":
+            shape = 1.0 / (self.jitter * self.jitter)
+            return rng.gammavariate(shape, mean / shape)
+        sigma = math.sqrt(math.log(1.0 + self.jitter * self.jitter))
+        return rng.lognormvariate(math.log(mean) - sigma * sigma / 2, sigma)
+
+def keysym(char):
+    """Tk keysym of a typed character"""
+    return KEYSYMS.get(char, char)
+
+def typo(char, rng):
+    """A plausible wrong key for char"""
+    near = NEIGHBOURS.get(char.lower())
+    if not near:
+        return rng.choice("etaoinshr")
+    wrong = rng.choice(near)
+    return wrong.upper() if char.isupper() else wrong
+
+def generate_keystrokes(reference, profile, rng=random, start=0.0):
+    """Key events (keysym, char, timestamp) of a typist typing reference"""
+    events = []
+    now = start
+    i = 0
+    while i < len(reference):
+        char = reference[i]
+        now += profile.interval(rng, profile.word_pause if char == " " else 1.0)
+        if rng.random() >= profile.error_rate:
+            events.append((keysym(char), char, now))
+            i += 1
+            continue
+
+        wrong = typo(char, rng)
+        events.append((keysym(wrong), wrong, now))
+        mistake = i
+        i += 1
+        if rng.random() >= profile.correction_rate:
+            continue
+
+        # Type on a little before noticing, then backspace to the mistake
+        for _ in range(rng.randint(0, profile.max_overrun)):
+            if i >= len(reference):
+                break
+            now += profile.interval(rng)
+            events.append((keysym(reference[i]), reference[i], now))
+            i += 1
+        now += profile.correction_delay
+        while i > mistake:
+            now += profile.interval(rng, 1.0 / profile.backspace_speed)
+            events.append(("BackSpace", "\x08", now))
+            i -= 1
+    return events
+
+def random_text(chars, rng=random, words=FALLBACK_WORDS):
+    """Reference text of about chars characters of random words"""
+    text = []
+    length = 0
+    while length < chars:
+        word = rng.choice(words)
+        text.append(word)
+        length += len(word) + 1
+    return " ".join(text)
+
+class RecordingText:
+    """Stand-in for the Text widget that counts the calls made on it"""
+
+    def __init__(self):
+        self.calls = Counter()
+
+    def __getattr__(self, name):
+        def record(*args, **kwargs):
+            self.calls[name] += 1
+        return record
+
+def percentiles(samples, points=(50, 90, 99, 99.9)):
+    """Nearest-rank percentiles and maximum of latencies, in microseconds"""
+    ordered = sorted(samples)
+    if not ordered:
+        return {}
+    report = {}
+    for point in points:
+        rank = max(math.ceil(point / 100.0 * len(ordered)) - 1, 0)
+        report[f"p{point:g}_us"] = ordered[rank] * 1e6
+    report["max_us"] = ordered[-1] * 1e6
+    report["mean_us"] = sum(ordered) / len(ordered) * 1e6
+    return report
+
+def latency_report(latencies, session):
+    """Latency percentiles plus a growth check and the typed result"""
+    report = {"keystrokes": len(latencies)}
+    report.update(percentiles(latencies))
+
+    # Handlers should cost the same at the end of a long test as at the start
+    tenth = max(len(latencies) // 10, 1)
+    early = sorted(latencies[:tenth])[tenth // 2]
+    late = sorted(latencies[-tenth:])[tenth // 2]
+    report["late_vs_early_median"] = late / early if early else 0.0
+
+    results = session.results()
+    report["wpm"] = results["wpm"]
+    report["accuracy"] = results["accuracy"]
+    report["errors"] = results["errors"]
+    return report
+
+def replay_headless(reference, events):
+    """Replay events into a TypingSession and highlighter, timing each keystroke.
+
+    Each keystroke does what TypingTest's handlers do: feed the session,
+    reconcile it with the input field text, retag the display and read
+    the live stats.
+    """
+    # Imported here so the generator can be used without tkinter
+    from typing_test import IncrementalHighlighter
+
+    session = TypingSession(reference)
+    text_widget = RecordingText()
+    highlighter = IncrementalHighlighter(text_widget)
+    highlighter.reset(reference)
+
+    typed = ""
+    latencies = []
+    perf_counter = time.perf_counter
+    for key, char, timestamp in events:
+        start = perf_counter()
+        # on_key_press
+        if key == "BackSpace":
+            session.backspace(timestamp)
+            typed = typed[:-1]
+        else:
+            session.type_char(char, timestamp)
+            typed += char
+        # check_input
+        session.apply_input(typed, timestamp)
+        highlighter.update(typed)
+        session.live_wpm(timestamp)
+        session.accuracy
+        latencies.append(perf_counter() - start)
+
+    report = latency_report(latencies, session)
+    report["widget_calls_per_key"] = sum(text_widget.calls.values()) / max(len(events), 1)
+    return report
+
+def replay_tk(app, events, speedup=10.0, on_done=None):
+    """Replay events into a running app's typing test with event_generate.
+
+    The app must be showing a typing test. Events are scheduled with
+    after() at speedup times their real pace; each KeyPress/KeyRelease
+    pair is timed as it runs through the real bindings. on_done(report)
+    is called when the last event has been replayed.
+    """
+    typing_test = app.typing_test
+    widget = typing_test.input_field
+    widget.focus_force()
+    latencies = []
+    origin = events[0][2] if events else 0.0
+
+    def send(index):
+        key = events[index][0]
+        start = time.perf_counter()
+        widget.event_generate("<KeyPress>", keysym=key)
+        widget.event_generate("<KeyRelease>", keysym=key)
+        latencies.append(time.perf_counter() - start)
+
+        # Typing the last character completes the test
+        if index + 1 < len(events) and not typing_test.test_completed:
+            delay = (events[index + 1][2] - events[index][2]) / speedup
+            app.after(max(int(delay * 1000), 0), send, index + 1)
+        elif on_done:
+            on_done(latency_report(latencies, typing_test.session))
+
+    if events:
+        app.after(int(origin * 1000 / speedup), send, 0)
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a synthetic typist into TypeMaster's typing logic")
+    parser.add_argument("--wpm", type=float, default=70, help="target typing speed")
+    parser.add_argument("--errors", type=float, default=0.03, help="chance of mistyping a key")
+    parser.add_argument("--corrections", type=float, default=0.9, help="chance of fixing a mistake")
+    parser.add_argument("--timing", choices=TypistProfile.TIMINGS, default="lognormal",
+                        help="inter-key interval distribution")
+    parser.add_argument("--jitter", type=float, default=0.4, help="coefficient of variation of intervals")
+    parser.add_argument("--chars", type=int, default=5000, help="length of the reference text")
+    parser.add_argument("--seed", type=int, default=1, help="random seed")
+    parser.add_argument("--tk", action="store_true", help="replay into the real widgets of a custom text test")
+    parser.add_argument("--speedup", type=float, default=10.0, help="replay speed for --tk")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    profile = TypistProfile(args.wpm, args.errors, args.corrections, args.timing, args.jitter)
+
+    if not args.tk:
+        reference = random_text(args.chars, rng)
+        events = generate_keystrokes(reference, profile, rng)
+        print(json.dumps(replay_headless(reference, events), indent=2))
+        return
+
+    import main as app_main
+    app = app_main.TypeMaster()
+    reference = random_text(args.chars, rng)
+    app.start_test("custom", None, reference)
+    events = generate_keystrokes(reference, profile, rng)
+
+    def done(report):
+        print(json.dumps(report, indent=2))
+        app.on_close()
+
+    # Simulated tests are reported, not saved
+    app.save_results = lambda results: None
+    replay_tk(app, events, args.speedup, done)
+    app.mainloop()
+
+if __name__ == "__main__":
+    main()
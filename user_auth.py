@@ -1,35 +1,19 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import sqlite3
-import hashlib
 import re
 
+from password_hasher import PasswordHasher
+
 class UserAuth:
-    def __init__(self, parent, db_manager):
+    def __init__(self, parent, db_manager, db_executor):
         self.parent = parent
         self.db_manager = db_manager
-        
-        # Create necessary tables if they don't exist
-        self.create_users_table()
-    
-    def create_users_table(self):
-        """Create users table in database if it doesn't exist"""
-        self.db_manager.cursor.execute('''
-        CREATE TABLE IF NOT EXISTS users (
-            username TEXT PRIMARY KEY,
-            password TEXT NOT NULL,
-            email TEXT,
-            date_joined TEXT DEFAULT CURRENT_TIMESTAMP,
-            tests_completed INTEGER DEFAULT 0,
-            avg_wpm REAL DEFAULT 0,
-            avg_accuracy REAL DEFAULT 0
-        )
-        ''')
-        self.db_manager.conn.commit()
+        self.db_executor = db_executor
+        self.password_hasher = PasswordHasher()
     
     def hash_password(self, password):
-        """Hash a password for security"""
-        return hashlib.sha256(password.encode()).hexdigest()
+        """Hash a password for security (slow, call from a worker)"""
+        return self.password_hasher.hash(password)
     
     def validate_email(self, email):
         """Validate email format"""
@@ -183,16 +167,42 @@ class UserAuth:
             messagebox.showerror("Error", "Username and password are required")
             return
         
-        # Get user from database
-        self.db_manager.cursor.execute(
+        # Check the credentials on a database worker
+        self.db_executor.submit(
+            self.check_login, username, password,
+            callback=lambda login: self.finish_login(username, login, window),
+            error_callback=lambda e: messagebox.showerror("Database Error", f"Error logging in: {e}")
+        )
+    
+    def check_login(self, username, password):
+        """Check the credentials, returning (valid, is_admin) (runs on a worker)"""
+        user = self.db_manager.execute(
             "SELECT * FROM users WHERE username = ?", 
             (username,)
-        )
-        user = self.db_manager.cursor.fetchone()
+        ).fetchone()
+        if not user or not self.password_hasher.verify(password, user[1]):
+            return False, False
+        
+        # Rehash legacy SHA-256 and outdated hashes now that the password is known
+        if self.password_hasher.needs_update(user[1]):
+            # Hash before taking the write lock; the UPDATE only applies if nobody changed it meanwhile
+            new_hash = self.hash_password(password)
+            with self.db_manager.transaction() as cursor:
+                cursor.execute(
+                    "UPDATE users SET password = ? WHERE username = ? AND password = ?",
+                    (new_hash, username, user[1])
+                )
+        return True, self.db_manager.is_admin(username)
+    
+    def finish_login(self, username, login, window):
+        """Complete a login attempt once the credentials have been checked"""
+        # The dialog was closed while the check was running
+        if not window.winfo_exists():
+            return
         
-        # Check if user exists and password matches
-        if user and user[1] == self.hash_password(password):
-            self.parent.current_user = username
+        valid, is_admin = login
+        if valid:
+            self.parent.set_current_user(username, is_admin)
             messagebox.showinfo("Login Successful", f"Welcome back, {username}!")
             window.destroy()
             # Show the typing test interface
@@ -219,31 +229,38 @@ class UserAuth:
             messagebox.showerror("Error", "Password must be at least 6 characters long")
             return
         
-        # Check if username already exists
-        self.db_manager.cursor.execute(
-            "SELECT * FROM users WHERE username = ?", 
-            (username,)
+        # Insert new user into database on a worker
+        self.db_executor.submit(
+            self.create_user, username, email, password,
+            callback=lambda created: self.finish_register(username, created, window),
+            error_callback=lambda e: messagebox.showerror("Database Error", f"Error creating account: {e}")
         )
-        if self.db_manager.cursor.fetchone():
-            messagebox.showerror("Error", "Username already exists")
-            return
-        
-        # Insert new user into database
-        try:
-            hashed_password = self.hash_password(password)
-            self.db_manager.cursor.execute(
+    
+    def create_user(self, username, email, password):
+        """Insert a new user, returning False if the username is taken (runs on a worker)"""
+        hashed_password = self.hash_password(password)
+        with self.db_manager.transaction() as cursor:
+            # Check if username already exists
+            if cursor.execute("SELECT 1 FROM users WHERE username = ?", (username,)).fetchone():
+                return False
+            cursor.execute(
                 "INSERT INTO users (username, password, email) VALUES (?, ?, ?)",
                 (username, hashed_password, email)
             )
-            self.db_manager.conn.commit()
-            
-            self.parent.current_user = username
-            messagebox.showinfo("Registration Successful", f"Welcome, {username}!")
+        return True
+    
+    def finish_register(self, username, created, window):
+        """Complete a registration attempt once the user has been inserted"""
+        if not created:
+            messagebox.showerror("Error", "Username already exists")
+            return
+        
+        self.parent.set_current_user(username)
+        messagebox.showinfo("Registration Successful", f"Welcome, {username}!")
+        if window.winfo_exists():
             window.destroy()
-            # Show the typing test interface
-            self.parent.start_test("time", 30)
-        except sqlite3.Error as e:
-            messagebox.showerror("Database Error", f"Error creating account: {e}")
+        # Show the typing test interface
+        self.parent.start_test("time", 30)
     
     def switch_to_register(self, window):
         """Close login window and open registration window"""
@@ -258,7 +275,7 @@ class UserAuth:
     def logout(self):
         """Log out the current user"""
         if self.parent.current_user:
-            self.parent.current_user = None
+            self.parent.set_current_user(None)
             messagebox.showinfo("Logout", "You have been logged out")
             self.parent.show_welcome_screen()
         else:
@@ -266,37 +283,14 @@ class UserAuth:
     
     def get_user_stats(self, username):
         """Get user statistics from database"""
-        self.db_manager.cursor.execute(
+        return self.db_manager.execute(
             "SELECT tests_completed, avg_wpm, avg_accuracy FROM users WHERE username = ?",
             (username,)
-        )
-        return self.db_manager.cursor.fetchone()
+        ).fetchone()
     
     def update_user_stats(self, username, wpm, accuracy):
-        """Update user statistics after a test"""
-        # Get current stats
-        self.db_manager.cursor.execute(
-            "SELECT tests_completed, avg_wpm, avg_accuracy FROM users WHERE username = ?",
-            (username,)
-        )
-        stats = self.db_manager.cursor.fetchone()
-        
-        if stats:
-            tests_completed, avg_wpm, avg_accuracy = stats
-            tests_completed += 1
-            
-            # Calculate new averages
-            new_avg_wpm = ((avg_wpm * (tests_completed - 1)) + wpm) / tests_completed
-            new_avg_accuracy = ((avg_accuracy * (tests_completed - 1)) + accuracy) / tests_completed
-            
-            # Update user stats
-            self.db_manager.cursor.execute(
-                """UPDATE users 
-                   SET tests_completed = ?, avg_wpm = ?, avg_accuracy = ? 
-                   WHERE username = ?""",
-                (tests_completed, new_avg_wpm, new_avg_accuracy, username)
-            )
-            self.db_manager.conn.commit()
+        """Update user statistics after a test on a database worker"""
+        return self.db_executor.submit(self.db_manager.update_user_stats, username, wpm, accuracy)
             
     def show_profile(self):
         """Display user profile and stats"""
@@ -304,8 +298,13 @@ class UserAuth:
             messagebox.showinfo("Login Required", "Please log in to view your profile")
             return
             
-        # Get user stats
-        stats = self.get_user_stats(self.parent.current_user)
+        # Get user stats on a worker
+        username = self.parent.current_user
+        self.db_executor.submit(self.get_user_stats, username,
+                                callback=lambda stats: self.show_profile_window(username, stats))
+    
+    def show_profile_window(self, username, stats):
+        """Create the profile window from loaded stats"""
         if not stats:
             return
             
@@ -319,7 +318,7 @@ class UserAuth:
         profile_window.transient(self.parent)
         
         # Title
-        title_label = tk.Label(profile_window, text=f"Profile: {self.parent.current_user}", 
+        title_label = tk.Label(profile_window, text=f"Profile: {username}", 
                             font=("Courier", 18, "bold"), bg="#323437", fg="#e2b714")
         title_label.pack(pady=20)
         
@@ -448,27 +447,38 @@ class UserAuth:
             messagebox.showerror("Error", "Password must be at least 6 characters long")
             return
         
+        # Check and update the password on a worker
+        self.db_executor.submit(
+            self.replace_password, self.parent.current_user, current_password, new_password,
+            callback=lambda changed: self.finish_change_password(changed, window),
+            error_callback=lambda e: messagebox.showerror("Database Error", f"Error changing password: {e}")
+        )
+    
+    def replace_password(self, username, current_password, new_password):
+        """Set a new password if the current one matches (runs on a worker)"""
         # Check current password
-        self.db_manager.cursor.execute(
+        stored_password = self.db_manager.execute(
             "SELECT password FROM users WHERE username = ?", 
-            (self.parent.current_user,)
-        )
-        stored_password = self.db_manager.cursor.fetchone()[0]
-        
-        if stored_password != self.hash_password(current_password):
+            (username,)
+        ).fetchone()[0]
+        if not self.password_hasher.verify(current_password, stored_password):
+            return False
+        
+        # Update password, unless it was changed elsewhere since the check
+        hashed_new_password = self.hash_password(new_password)
+        with self.db_manager.transaction() as cursor:
+            cursor.execute(
+                "UPDATE users SET password = ? WHERE username = ? AND password = ?",
+                (hashed_new_password, username, stored_password)
+            )
+            return cursor.rowcount == 1
+    
+    def finish_change_password(self, changed, window):
+        """Report the result of a password change"""
+        if not changed:
             messagebox.showerror("Error", "Current password is incorrect")
             return
         
-        # Update password
-        try:
-            hashed_new_password = self.hash_password(new_password)
-            self.db_manager.cursor.execute(
-                "UPDATE users SET password = ? WHERE username = ?",
-                (hashed_new_password, self.parent.current_user)
-            )
-            self.db_manager.conn.commit()
-            
-            messagebox.showinfo("Success", "Password changed successfully")
-            window.destroy()
-        except sqlite3.Error as e:
-            messagebox.showerror("Database Error", f"Error changing password: {e}")
\ No newline at end of file
+        messagebox.showinfo("Success", "Password changed successfully")
+        if window.winfo_exists():
+            window.destroy()
\ No newline at end of file